@@ -0,0 +1,56 @@
+import json
+from typing import Any, Union
+
+# Fast JSON backends are optional, the standard library is used when neither is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# JSON encoding and decoding of server messages with the fastest backend available
+class JsonCodec:
+    def __init__(self, backend: str = None) -> None:
+        if backend is None:
+            backend = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+
+        if backend == "orjson" and orjson is not None:
+            self.__loads, self.__dumps = orjson.loads, orjson.dumps
+        elif backend == "msgspec" and msgspec is not None:
+            self.__loads, self.__dumps = msgspec.json.decode, msgspec.json.encode
+        elif backend == "json":
+            self.__loads, self.__dumps = JsonCodec.__json_loads, JsonCodec.__json_dumps
+        else:
+            raise ValueError(f"JSON backend {backend} is not available")
+        self.__backend: str = backend
+
+    @property
+    def backend(self) -> str:
+        return self.__backend
+
+    # Fast backends parse straight from a buffer, the standard library needs a str copy of it first
+    @property
+    def copies_input(self) -> bool:
+        return self.__backend == "json"
+
+    def loads(self, data: Union[bytes, memoryview]) -> Any:
+        return self.__loads(data)
+
+    def dumps(self, data: Any) -> bytes:
+        return self.__dumps(data)
+
+    @staticmethod
+    def __json_loads(data: Union[bytes, memoryview]) -> Any:
+        return json.loads(str(data, 'utf-8'))
+
+    @staticmethod
+    def __json_dumps(data: Any) -> bytes:
+        return json.dumps(data).encode('utf-8')
+
+
+codec: JsonCodec = JsonCodec()
@@ -0,0 +1,152 @@
+import atexit
+import time
+from threading import Lock
+from typing import Optional
+
+from src.client.game_client import ServerConnection
+from src.client.messages import PlayerInfo
+from src.client.protocol import ConnectionLost
+from src.constants import POOL_MAX_IDLE, POOL_IDLE_TIMEOUT
+
+
+# Connect and login latencies of a pool, in seconds
+class PoolStats:
+    def __init__(self) -> None:
+        self.__connects: int = 0
+        self.__reuses: int = 0
+        self.__connect_time: float = 0.0
+        self.__connect_max: float = 0.0
+        self.__logins: int = 0
+        self.__login_time: float = 0.0
+        self.__login_max: float = 0.0
+
+    @property
+    def connects(self) -> int:
+        return self.__connects
+
+    @property
+    def reuses(self) -> int:
+        return self.__reuses
+
+    @property
+    def logins(self) -> int:
+        return self.__logins
+
+    def count_connect(self, elapsed: float) -> None:
+        self.__connects += 1
+        self.__connect_time += elapsed
+        self.__connect_max = max(self.__connect_max, elapsed)
+
+    def count_reuse(self) -> None:
+        self.__reuses += 1
+
+    def count_login(self, elapsed: float) -> None:
+        self.__logins += 1
+        self.__login_time += elapsed
+        self.__login_max = max(self.__login_max, elapsed)
+
+    def summary(self) -> str:
+        connect_avg = self.__connect_time / self.__connects if self.__connects else 0.0
+        login_avg = self.__login_time / self.__logins if self.__logins else 0.0
+        return f"{self.__connects} connections opened (avg {connect_avg:.3f}s, max {self.__connect_max:.3f}s), " \
+               f"{self.__reuses} reused, {self.__logins} logins (avg {login_avg:.3f}s, max {self.__login_max:.3f}s)"
+
+
+# Server connections kept open between games. A logout hands the connection back instead of closing it, the next
+# login takes the most recently used one that is still alive and opens a new one only if there is none.
+class ConnectionPool:
+    def __init__(self, max_idle: int = POOL_MAX_IDLE, idle_timeout: float = POOL_IDLE_TIMEOUT) -> None:
+        self.__max_idle: int = max_idle
+        self.__idle_timeout: float = idle_timeout
+        self.__idle: list[tuple[float, ServerConnection]] = []
+        self.__lock: Lock = Lock()
+        self.__stats: PoolStats = PoolStats()
+
+    @property
+    def stats(self) -> PoolStats:
+        return self.__stats
+
+    @property
+    def idle(self) -> int:
+        return len(self.__idle)
+
+    # Pooled connection logged in with the given arguments. A reused connection that turns out to be broken is
+    # dropped and the login is repeated once on a new one. A login the server refuses raises its error, the
+    # connection stays in the pool.
+    def login(self, name: str, password: str = None, game: str = None, num_turns: int = None,
+              num_players: int = None, is_observer: bool = None,
+              is_full: bool = None) -> tuple[ServerConnection, PlayerInfo]:
+        connection = self.__take_idle()
+        if connection is not None:
+            try:
+                return connection, self.__login(connection, name, password, game, num_turns, num_players,
+                                                is_observer, is_full)
+            except ConnectionLost:
+                connection.close()
+
+        connection = self.__connect()
+        try:
+            return connection, self.__login(connection, name, password, game, num_turns, num_players, is_observer,
+                                            is_full)
+        except ConnectionLost:
+            connection.close()
+            raise
+
+    # Called by a connection after its logout
+    def release(self, connection: ServerConnection) -> None:
+        with self.__lock:
+            self.__idle.append((time.monotonic(), connection))
+            while len(self.__idle) > self.__max_idle:
+                _, oldest = self.__idle.pop(0)
+                oldest.close()
+
+    def close(self) -> None:
+        with self.__lock:
+            idle, self.__idle = self.__idle, []
+        for _, connection in idle:
+            connection.close()
+
+    # Most recently released connection that is still usable, stale ones are closed on the way
+    def __take_idle(self) -> Optional[ServerConnection]:
+        with self.__lock:
+            while self.__idle:
+                released_at, connection = self.__idle.pop()
+                connection.reuse()
+                if time.monotonic() - released_at <= self.__idle_timeout and connection.is_alive():
+                    self.__stats.count_reuse()
+                    return connection
+                connection.close()
+        return None
+
+    def __login(self, connection: ServerConnection, *args) -> PlayerInfo:
+        started = time.monotonic()
+        try:
+            player_info = connection.login(*args)
+        except ConnectionLost:
+            raise
+        except Exception:
+            # Refused by the server, the connection itself is fine
+            self.release(connection)
+            raise
+        self.__stats.count_login(time.monotonic() - started)
+        return player_info
+
+    def __connect(self) -> ServerConnection:
+        started = time.monotonic()
+        connection = ServerConnection(self.release)
+        self.__stats.count_connect(time.monotonic() - started)
+        return connection
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock: Lock = Lock()
+
+
+# Pool shared by all games of the process, idle connections are closed on exit
+def connection_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+            atexit.register(_pool.close)
+        return _pool
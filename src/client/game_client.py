@@ -1,16 +1,76 @@
 import socket
-import json
+from typing import Callable, Optional
 
-from src.constants import Action, Result, SERVER_HOST, SERVER_PORT, MAX_CHUNK_SIZE
+from src.client.protocol import HEADER_SIZE, ConnectionLost, encode_request, parse_header, parse_body, \
+    check_response
+from src.client.messages import GameAction, GameState, MapInfo, PlayerInfo, decode_game_actions, \
+    decode_game_state, decode_map, decode_player
+from src.client.codec import codec
+from src.constants import Action, SERVER_HOST, SERVER_PORT, RECEIVE_BUFFER_SIZE
+from src.map.hex_grid import HexGrid
 
 
-class ServerConnection:
+# Bytes received by a connection and the copies made of them after they land in the receive buffer
+class ReceiveStats:
     def __init__(self) -> None:
+        self.__messages: int = 0
+        self.__bytes: int = 0
+        self.__copies: int = 0
+        self.__growths: int = 0
+
+    @property
+    def messages(self) -> int:
+        return self.__messages
+
+    @property
+    def bytes(self) -> int:
+        return self.__bytes
+
+    @property
+    def copies(self) -> int:
+        return self.__copies
+
+    @property
+    def growths(self) -> int:
+        return self.__growths
+
+    def count_message(self, size: int) -> None:
+        self.__messages += 1
+        self.__bytes += size
+
+    def count_copy(self) -> None:
+        self.__copies += 1
+
+    def count_growth(self) -> None:
+        self.__growths += 1
+        self.__copies += 1
+
+    def summary(self) -> str:
+        per_message = self.__copies / self.__messages if self.__messages else 0.0
+        return f"{self.__messages} messages received, {self.__bytes} bytes, " \
+               f"{per_message:.2f} copies per message, buffer grown {self.__growths} times"
+
+
+class ServerConnection:
+    # release is called with the connection after a logout, a pool uses it to take the connection back
+    def __init__(self, release: Optional[Callable[["ServerConnection"], None]] = None) -> None:
         self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         self.__socket.connect((SERVER_HOST, SERVER_PORT))
+        self.__release: Optional[Callable[[ServerConnection], None]] = release
+        self.__released: bool = False
+
+        # Responses are received into one reusable buffer instead of a new bytes object per chunk
+        self.__buffer: bytearray = bytearray(RECEIVE_BUFFER_SIZE)
+        self.__view: memoryview = memoryview(self.__buffer)
+        self.__stats: ReceiveStats = ReceiveStats()
+
+    @property
+    def stats(self) -> ReceiveStats:
+        return self.__stats
 
     def login(self, name: str, password: str = None, game: str = None, num_turns: int = None,
-              num_players: int = None, is_observer: bool = None, is_full: bool = None) -> dict:
+              num_players: int = None, is_observer: bool = None, is_full: bool = None) -> PlayerInfo:
 
         data: dict = {
             "name": name,
@@ -24,19 +84,47 @@ class ServerConnection:
 
         data = {key: value for (key, value) in data.items() if value is not None}
 
-        return self.__send_data(Action.LOGIN, data)
+        return decode_player(self.__send_data(Action.LOGIN, data))
 
     def logout(self) -> None:
         self.__send_data(Action.LOGOUT)
+        if self.__release is not None:
+            self.__released = True
+            self.__release(self)
 
-    def map(self) -> dict:
-        return self.__send_data(Action.MAP)
+    # Handed back to its pool by logout, disconnect leaves it open for the next login
+    @property
+    def released(self) -> bool:
+        return self.__released
 
-    def game_state(self) -> dict:
-        return self.__send_data(Action.GAME_STATE)
+    # Taken out of the pool again
+    def reuse(self) -> None:
+        self.__released = False
 
-    def game_actions(self) -> dict:
-        return self.__send_data(Action.GAME_ACTIONS)
+    # Open and idle: the server hasn't closed it and there is no unread data on it
+    def is_alive(self) -> bool:
+        try:
+            self.__socket.setblocking(False)
+            # Either the server has closed it or a response nobody waits for is there, neither can be used
+            self.__socket.recv(1, socket.MSG_PEEK)
+            return False
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            if self.__socket.fileno() >= 0:
+                self.__socket.setblocking(True)
+
+    def map(self) -> MapInfo:
+        return decode_map(self.__send_data(Action.MAP))
+
+    # Hexes are interned in grid if one is given
+    def game_state(self, grid: Optional[HexGrid] = None) -> GameState:
+        return decode_game_state(self.__send_data(Action.GAME_STATE), grid)
+
+    def game_actions(self, grid: Optional[HexGrid] = None) -> tuple[GameAction, ...]:
+        return decode_game_actions(self.__send_data(Action.GAME_ACTIONS), grid)
 
     def turn(self) -> int:
         try:
@@ -56,64 +144,65 @@ class ServerConnection:
         self.__send_data(Action.SHOOT, data)
 
     def disconnect(self) -> None:
-        self.__socket.close()
-
-    @staticmethod
-    def __parse_response(response_msg: bytes) -> [Result, dict]:
-        result_code = int.from_bytes(response_msg[:4], 'little')
-        data_len = int.from_bytes(response_msg[4:8], 'little')
-
-        if data_len == 0:
-            return result_code, None
+        if not self.__released:
+            self.close()
 
-        data_json = response_msg[8:8 + data_len].decode('utf-8')
-        response_data = json.loads(data_json)
-        return result_code, response_data
-
-    @staticmethod
-    def __encode_message(data: dict) -> bytes:
-        data_json = json.dumps(data).encode('utf-8')
-        data_len = len(data_json)
-        return data_len.to_bytes(4, 'little') + data_json
+    def close(self) -> None:
+        self.__released = False
+        self.__socket.close()
+        self.__view.release()
 
     def __send_data(self, action: Action, data: dict = None) -> dict:
-        if data is not None:
-            msg = action.value.to_bytes(4, "little") + self.__encode_message(data)
-        else:
-            msg = action.value.to_bytes(8, "little")
-
-        self.__socket.sendall(msg)
-
-        response_code, response_data = self.__parse_response(self.receive_message())
-
-        if response_code == Result.TIMEOUT:
-            data: dict = response_data
-            raise TimeoutError(f"Error type {response_code}: {data['error_message']}")
-        elif response_code != Result.OKEY:
-            data: dict = response_data
-            raise ConnectionError(f"Error type {response_code}: {data['error_message']}")
-        elif response_data is not None and len(response_data) > 0:
-            return response_data
-
-        return {}
-
-    def receive_message(self) -> bytes:
-        # First, receive the action code and message length
-        header = self.__socket.recv(8)
-        if not header:
-            # If the received header is empty, the connection was closed
-            raise ConnectionError("Connection closed by server")
-
-        data_len = int.from_bytes(header[4:], 'little')
-
-        # Receive the rest of the message in chunks
-        chunks = []
-        bytes_received = 0
-        while bytes_received < data_len:
-            chunk = self.__socket.recv(min(MAX_CHUNK_SIZE, data_len - bytes_received))
-            if not chunk:
-                # If the received chunk is empty, the connection was closed
-                raise ConnectionError("Connection closed by server")
-            chunks.append(chunk)
-            bytes_received += len(chunk)
-        return header + b"".join(chunks)
+        try:
+            self.__socket.sendall(encode_request(action, data))
+            response = self.receive_message()
+        except ConnectionLost:
+            raise
+        except OSError as e:
+            raise ConnectionLost(f"Connection lost: {e}") from e
+        response_code, _ = parse_header(response)
+        body = response[HEADER_SIZE:]
+        if len(body) and codec.copies_input:
+            # The standard library decodes from a str copy of the body, fast backends from the buffer itself
+            self.__stats.count_copy()
+        try:
+            response_data = parse_body(body)
+        finally:
+            body.release()
+            response.release()
+
+        return check_response(response_code, response_data)
+
+    # Header and body of the next response, a view of the receive buffer that is valid until the next call
+    def receive_message(self) -> memoryview:
+        # First, receive the result code and message length
+        self.__receive_into(0, HEADER_SIZE)
+        _, data_len = parse_header(self.__buffer)
+
+        size = HEADER_SIZE + data_len
+        if size > len(self.__buffer):
+            self.__grow(size)
+
+        # Receive the rest of the message straight into the buffer
+        self.__receive_into(HEADER_SIZE, data_len)
+        self.__stats.count_message(size)
+        return self.__view[:size]
+
+    def __receive_into(self, offset: int, length: int) -> None:
+        end = offset + length
+        while offset < end:
+            received = self.__socket.recv_into(self.__view[offset:end])
+            if not received:
+                # If nothing was received, the connection was closed
+                raise ConnectionLost("Connection closed by server")
+            offset += received
+
+    # Only the header has been received when the buffer grows, so that is all there is to copy
+    def __grow(self, size: int) -> None:
+        buffer = bytearray(max(size, 2 * len(self.__buffer)))
+        buffer[:HEADER_SIZE] = self.__view[:HEADER_SIZE]
+        self.__view.release()
+        self.__buffer = buffer
+        self.__view = memoryview(buffer)
+        self.__stats.count_growth()
+
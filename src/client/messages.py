@@ -0,0 +1,93 @@
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+from src.constants import Action
+from src.map.hex import Hex
+from src.map.hex_grid import HexGrid
+
+
+# Typed server messages. Ids are ints and, when a grid is given, hexes are the grid's interned instances,
+# so the map can use them as they are. Messages are immutable, one decoded state is shared by every thread.
+
+class PlayerInfo(NamedTuple):
+    idx: int
+    name: str
+    is_observer: bool
+
+
+class VehicleState(NamedTuple):
+    id: int
+    player_id: int
+    vehicle_type: str
+    health: int
+    spawn_position: Hex
+    position: Hex
+    capture_points: int
+
+
+class GameState(NamedTuple):
+    num_players: int
+    num_turns: int
+    num_rounds: int
+    current_turn: int
+    current_round: int
+    current_player_idx: int
+    finished: bool
+    players: tuple[PlayerInfo, ...]
+    observers: tuple[PlayerInfo, ...]
+    vehicles: tuple[VehicleState, ...]
+    winner: Optional[int]
+    player_result_points: Mapping[int, int]
+
+
+class GameAction(NamedTuple):
+    action_type: Action
+    player_id: int
+    vehicle_id: int
+    target: Hex
+
+
+# Terrain is kept as coordinates, there is no grid to intern them in before the map is built
+class MapInfo(NamedTuple):
+    size: int
+    name: str
+    content: dict[str, tuple[tuple[int, int, int], ...]]
+
+
+def decode_player(data: dict) -> PlayerInfo:
+    return PlayerInfo(data["idx"], data.get("name", ""), bool(data.get("is_observer", False)))
+
+
+def decode_game_state(data: dict, grid: Optional[HexGrid] = None) -> GameState:
+    vehicles = tuple(VehicleState(int(tank_id), info["player_id"], info["vehicle_type"], info["health"],
+                                  _to_hex(info["spawn_position"], grid), _to_hex(info["position"], grid),
+                                  info["capture_points"])
+                     for tank_id, info in data.get("vehicles", {}).items())
+
+    return GameState(data["num_players"], data["num_turns"], data["num_rounds"], data["current_turn"],
+                     data["current_round"], data["current_player_idx"], data["finished"],
+                     tuple(decode_player(p) for p in data.get("players", ())),
+                     tuple(decode_player(p) for p in data.get("observers", ())),
+                     vehicles, data.get("winner"),
+                     MappingProxyType({int(idx): points
+                                       for idx, points in data.get("player_result_points", {}).items()}))
+
+
+# Only moves and shots are kept, chat messages carry no vehicle
+def decode_game_actions(data: dict, grid: Optional[HexGrid] = None) -> tuple[GameAction, ...]:
+    return tuple(GameAction(Action(action["action_type"]), action.get("player_id", 0),
+                            action["data"]["vehicle_id"], _to_hex(action["data"]["target"], grid))
+                 for action in data.get("actions", ())
+                 if action["action_type"] in (Action.MOVE, Action.SHOOT))
+
+
+def decode_map(data: dict) -> MapInfo:
+    content = {name: tuple((p["x"], p["y"], p["z"]) for p in positions)
+               for name, positions in data.get("content", {}).items()}
+    return MapInfo(data["size"], data.get("name", ""), content)
+
+
+def _to_hex(data: dict, grid: Optional[HexGrid]) -> Hex:
+    if grid is not None:
+        return grid.dict_to_hex(data)
+    return Hex(t=(data['x'], data['y'], data['z']))
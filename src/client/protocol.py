@@ -0,0 +1,44 @@
+from typing import Optional, Union
+
+from src.client.codec import codec
+from src.constants import Action, Result
+
+# Result code and data length of every response, both little-endian uint32
+HEADER_SIZE = 8
+
+
+# The connection itself failed, as opposed to the server answering a request with an error result
+class ConnectionLost(ConnectionError):
+    pass
+
+
+# Action code, data length and JSON data of a request; requests without data send a zero length
+def encode_request(action: Action, data: dict = None) -> bytes:
+    if data is None:
+        return action.value.to_bytes(HEADER_SIZE, "little")
+
+    data_json = codec.dumps(data)
+    return action.value.to_bytes(4, "little") + len(data_json).to_bytes(4, "little") + data_json
+
+
+def parse_header(header: bytes) -> tuple[int, int]:
+    return int.from_bytes(header[:4], 'little'), int.from_bytes(header[4:HEADER_SIZE], 'little')
+
+
+# Decodes straight from a buffer with the codec's backend
+def parse_body(data: Union[bytes, memoryview]) -> Optional[dict]:
+    if not data:
+        return None
+    return codec.loads(data)
+
+
+# Data of a successful response; a timeout raises TimeoutError and every other error code ConnectionError
+def check_response(response_code: int, response_data: Optional[dict]) -> dict:
+    if response_code == Result.TIMEOUT:
+        raise TimeoutError(f"Error type {response_code}: {response_data['error_message']}")
+    elif response_code != Result.OKEY:
+        raise ConnectionError(f"Error type {response_code}: {response_data['error_message']}")
+    elif response_data is not None and len(response_data) > 0:
+        return response_data
+
+    return {}
@@ -0,0 +1,91 @@
+from collections import Counter
+from threading import Lock, RLock
+from typing import NamedTuple, Optional
+
+from src.client.game_client import ServerConnection
+from src.client.messages import GameAction, GameState, MapInfo
+from src.constants import Action
+from src.map.hex_grid import HexGrid
+
+
+# What a turn looks like from the outside: the game state it started with and the actions played in it
+class TurnView(NamedTuple):
+    state: Optional[GameState]
+    actions: tuple[GameAction, ...]
+
+
+# The one place the game state comes from. The info connection fetches the state at most once per turn and the
+# last turn's actions at most once, the game and the remote players read them from here. Ending the turn is the
+# only thing that makes them stale; the latest ones stay readable through view, e.g. for drawing.
+class TurnHub:
+    def __init__(self, client: ServerConnection) -> None:
+        self.__client: ServerConnection = client
+        # Requests on the connection are made one at a time; the published state has a lock of its own, so view
+        # never waits for a request, not even for the TURN that blocks until the turn ends
+        self.__request_lock: RLock = RLock()
+        self.__lock: Lock = Lock()
+        self.__state: Optional[GameState] = None
+        self.__actions: tuple[GameAction, ...] = ()
+        self.__state_current: bool = False
+        self.__actions_current: bool = False
+        self.__turns: int = 0
+        self.__requests: Counter = Counter()
+
+    # Latest state and actions, readable at any time without a request
+    @property
+    def view(self) -> TurnView:
+        with self.__lock:
+            return TurnView(self.__state, self.__actions)
+
+    # Server requests made through the hub, by action
+    @property
+    def requests(self) -> Counter:
+        return self.__requests
+
+    # Terrain never changes, it is only fetched once per game
+    def map(self) -> MapInfo:
+        with self.__request_lock:
+            self.__requests[Action.MAP] += 1
+            return self.__client.map()
+
+    def state(self, grid: Optional[HexGrid] = None) -> GameState:
+        with self.__request_lock:
+            if not self.__state_current:
+                self.__requests[Action.GAME_STATE] += 1
+                state = self.__client.game_state(grid)
+                with self.__lock:
+                    self.__state = state
+                self.__state_current = True
+            return self.__state
+
+    # Lobby polls always go to the server, the last one is kept for the start of the game
+    def refresh(self, grid: Optional[HexGrid] = None) -> GameState:
+        with self.__request_lock:
+            self.__state_current = False
+            return self.state(grid)
+
+    def actions(self, grid: Optional[HexGrid] = None) -> tuple[GameAction, ...]:
+        with self.__request_lock:
+            if not self.__actions_current:
+                self.__requests[Action.GAME_ACTIONS] += 1
+                actions = self.__client.game_actions(grid)
+                with self.__lock:
+                    self.__actions = actions
+                self.__actions_current = True
+            return self.__actions
+
+    # Ends the turn on the info connection; the state and actions fetched so far belong to the turn that ended
+    def turn(self) -> int:
+        with self.__request_lock:
+            self.__requests[Action.TURN] += 1
+            result = self.__client.turn()
+            self.__state_current = False
+            self.__actions_current = False
+            self.__turns += 1
+            return result
+
+    def summary(self) -> str:
+        total = sum(self.__requests.values())
+        per_turn = total / self.__turns if self.__turns else 0.0
+        counts = ", ".join(f"{action.name.lower()}: {count}" for action, count in self.__requests.most_common())
+        return f"{total} requests over {self.__turns} turns ({per_turn:.2f} per turn){f', {counts}' if counts else ''}"
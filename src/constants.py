@@ -3,7 +3,18 @@ from enum import IntEnum
 # Server info
 SERVER_HOST = "wgforge-srv.wargaming.net"
 SERVER_PORT = 443
-MAX_CHUNK_SIZE = 1024
+# Initial size of the receive buffer of a connection, it grows to fit the largest message
+RECEIVE_BUFFER_SIZE = 64 * 1024
+# Logged out connections kept open for the next game, and for how long, in seconds
+POOL_MAX_IDLE = 8
+POOL_IDLE_TIMEOUT = 60.0
+
+# Lobby polling, in seconds
+LOBBY_POLL_MIN_DELAY = 0.1
+LOBBY_POLL_MAX_DELAY = 2.0
+
+# How long the main loop waits on a game signal per frame, in seconds
+GAME_SIGNAL_TIMEOUT = 1 / 60
 
 # Screen info
 SCREEN_WIDTH = 1200
@@ -45,6 +56,16 @@ class Result(IntEnum):
     INTERNAL_SERVER_ERROR = 500
 
 
+# Map enums
+class Terrain(IntEnum):
+    EMPTY = 0
+    BASE = 1
+    OBSTACLE = 2
+    LIGHT_REPAIR = 3
+    HEAVY_REPAIR = 4
+    CATAPULT = 5
+
+
 # Tank info
 tank_characteristics: dict = {
     "spg": {
@@ -98,6 +119,44 @@ LEGEND_TEXT_POSITION = [(1005, 56), (1005, 93), (1005, 130), (1005, 167),
                         (1005, 204), (1005, 601), (1005, 638), (1005, 675)]
 LEGEND_NAME = ["spg", "light_tank", "heavy_tank", "medium_tank", "at_spg", "catapult", "heavy_repair", "light_repair"]
 
+# Precomputed path tables are cached here, keyed by the map payload hash
+PATH_TABLE_CACHE_DIR = ".cache/path_tables"
+
+# Number of times each catapult can be used in a round
+CATAPULT_CHARGES = 3
+# Range added by a catapult until the next shot
+CATAPULT_BONUS_RANGE = 1
+
+# Time from the start of a turn until planning must hand in its best actions, in seconds
+TURN_PLANNING_DEADLINE = 0.5
+
+# Joint move planning: turns looked ahead and CPU time allowed per turn, in seconds
+PLANNER_HORIZON = 3
+PLANNER_CPU_BUDGET = 0.05
+
+# Lookahead search, used by bots instead of the per-tank tactics when enabled
+SEARCH_ENABLED = False
+SEARCH_BEAM_WIDTH = 8
+SEARCH_DEPTH = 2
+# Moves tried per tank and state, the ones closest to the base first
+SEARCH_MOVE_CANDIDATES = 6
+# Evaluated states kept in the transposition table
+SEARCH_TT_SIZE = 50000
+
+# Worker processes for the search, 0 keeps all planning on the player threads
+WORKER_PROCESSES = 0
+# Workers stop this long before the turn deadline so their results arrive in time, in seconds
+WORKER_DEADLINE_MARGIN = 0.02
+# Tank slots in the shared-memory snapshot handed to workers
+SNAPSHOT_CAPACITY = 32
+# Fire allocation: value of a kill on top of the destruction points, value of every capture point denied by one
+FIRE_KILL_VALUE = 10
+FIRE_CP_VALUE = 5
+# Search nodes the fire allocation may expand in a turn
+FIRE_MAX_NODES = 20000
+# Raise DesyncError as soon as local tanks disagree with the server, meant for test games
+VALIDATOR_STRICT = False
+
 # abs values of optimal hex coordinates for each tank
 OPTIMAL_HEXES = {
     "spg": 6,
@@ -2,7 +2,7 @@ import pygame
 from pygame import Surface
 from pygame.time import Clock
 
-from src.constants import SCREEN_WIDTH, SCREEN_HEIGHT, ICON_PATH
+from src.constants import SCREEN_WIDTH, SCREEN_HEIGHT, ICON_PATH, GAME_SIGNAL_TIMEOUT
 from src.gui.menu import Menu
 
 
@@ -31,11 +31,9 @@ class Controller:
         self.__game = game
 
         self.__playing = True
+        self.__menu.enable_loading_screen()
         self.__game.start()
 
-        while not self.__game.map:
-            pass
-
     def __events(self) -> list[pygame.event.Event]:
         events = pygame.event.get()
         for event in events:
@@ -47,6 +45,11 @@ class Controller:
 
         return events
 
+    # The lobby map is drawn until the game starts, after that the map is rebuilt between rounds and the last
+    # frame stays up until the next round has started
+    def __round_ready(self) -> bool:
+        return not self.__game.game_started.is_set() or self.__game.round_started.wait(GAME_SIGNAL_TIMEOUT)
+
     def start_controller(self) -> None:
         try:
             self.run()
@@ -68,14 +71,22 @@ class Controller:
                 self.__menu.update_end_screen(events)
                 self.__menu.draw_end_screen(self.__screen)
 
-            if self.__playing and self.__game.running:
+            # Loading screen stays up until the game thread has the map, instead of spinning on it
+            if self.__menu.is_loading_screen_enabled():
+                self.__menu.update_loading_screen(events)
+                self.__menu.draw_loading_screen(self.__screen)
+                self.__menu.wait_loading(self.__game.map_ready, GAME_SIGNAL_TIMEOUT)
+
+            # Tanks are drawn from the last game state the server sent, not from the map the players are changing
+            if self.__playing and self.__game.running and self.__game.map_ready.is_set() and self.__round_ready():
                 self.__game.map.draw_map(self.__screen, self.__game.current_turn, self.__game.num_turns,
-                                         self.__game.current_round, self.__game.num_rounds)
+                                         self.__game.current_round, self.__game.num_rounds, self.__game.view.state)
 
-            if self.__playing and not self.__game.running:
+            if self.__playing and (not self.__game.running or self.__game.game_over.is_set()):
                 print("Game is over!")
                 self.__playing = False
                 self.__menu.disable()
+                self.__menu.disable_loading_screen()
                 self.__menu.enable_end_screen()
 
             self.__clock.tick(60)
@@ -1,12 +1,16 @@
 from pygame.time import Clock
-from threading import Semaphore
-from typing import Optional
+from threading import Semaphore, Event
+from typing import Iterable, Mapping, Optional
 from threading import Thread
 import random
 import time
 
-from src.client.game_client import ServerConnection
+from src.client.connection_pool import ConnectionPool, connection_pool
+from src.client.messages import GameState, MapInfo, PlayerInfo
+from src.client.turn_hub import TurnHub, TurnView
+from src.constants import LOBBY_POLL_MIN_DELAY, LOBBY_POLL_MAX_DELAY
 from src.map.game_map import Map
+from src.map.hex_grid import HexGrid
 from src.players.player_factory import PlayerFactory
 from src.players.player import Player
 from src.players.remote_player import RemotePlayer
@@ -19,6 +23,12 @@ class Game(Thread):
         self.__name: str = name
         self.map: Optional[Map] = None
         self.running: bool = True
+
+        # Readiness signals for the controller and the menu
+        self.map_ready: Event = Event()
+        self.game_started: Event = Event()
+        self.round_started: Event = Event()
+        self.game_over: Event = Event()
         self.__winner: Optional[int] = None
         self.__is_full: bool = is_full
 
@@ -29,11 +39,14 @@ class Game(Thread):
         self.__round_started: bool = False
 
         # Observer client used for obtaining information about game
-        self.__info_client: ServerConnection = ServerConnection()
+        # Connections come from the process-wide pool and go back to it on logout
+        self.__pool: ConnectionPool = connection_pool()
         rnd = random.randint(100000, 200000)
-        self.__info_client_idx: int = self.__info_client.login(f"Info Client - Game Wizards - {rnd}", game=self.__name,
-                                                               num_turns=self.num_turns, num_players=max_players,
-                                                               is_observer=True, is_full=self.__is_full)["idx"]
+        self.__info_client, info = self.__pool.login(f"Info Client - Game Wizards - {rnd}", game=self.__name,
+                                                     num_turns=self.num_turns, num_players=max_players,
+                                                     is_observer=True, is_full=self.__is_full)
+        self.__info_client_idx: int = info.idx
+        self.__hub: TurnHub = TurnHub(self.__info_client)
 
         self.__current_player: Optional[Player] = None
         self.__waiting_players: list[Player] = []
@@ -47,6 +60,12 @@ class Game(Thread):
 
         self.__turn_played_sem: Semaphore = Semaphore(0)
         self.__clock: Clock = Clock()
+        self.lobby_wait_time: Optional[float] = None
+
+    # Latest game state and actions, without a server request
+    @property
+    def view(self) -> TurnView:
+        return self.__hub.view
 
     def add_local_player(self, name: str, password: str = None, is_observer: bool = None) -> None:
         if self.__game_players >= self.__max_players:
@@ -68,18 +87,18 @@ class Game(Thread):
 
         self.__waiting_players.append(player)
 
-    def add_remote_players(self, player_list: list[dict]) -> None:
+    def add_remote_players(self, player_list: Iterable[PlayerInfo]) -> None:
         for p in player_list:
-            if p["idx"] not in self.__players_in_game.keys():
-                if not p["is_observer"]:
+            if p.idx not in self.__players_in_game.keys():
+                if not p.is_observer:
                     self.__game_players += 1
                     self.__all_players += 1
-                player: Player = PlayerFactory.create_player("remote_player", p["name"], self.__turn_played_sem,
+                player: Player = PlayerFactory.create_player("remote_player", p.name, self.__turn_played_sem,
                                                              self.__current_player_idx, self.__game_players - 1,
-                                                             self.running, is_observer=p["is_observer"])
+                                                             self.running, is_observer=p.is_observer)
 
-                player.add(p, self.__info_client)
-                self.__players_in_game[p["idx"]] = player
+                player.add(p, self.__info_client, self.__hub)
+                self.__players_in_game[p.idx] = player
 
     def run(self) -> None:
         try:
@@ -102,7 +121,7 @@ class Game(Thread):
             player.next_turn_sem.release()
 
         if not isinstance(self.__current_player, RemotePlayer) and self.running:
-            self.__info_client.turn()
+            self.__hub.turn()
 
         for _ in range(self.__all_players):
             self.__turn_played_sem.acquire()
@@ -111,57 +130,101 @@ class Game(Thread):
         self.running = True
         self.__wait_for_all_players()
 
-        game_state: dict = self.__info_client.game_state()
+        # The state the lobby ended with
+        game_state: GameState = self.__hub.state()
 
-        self.__max_players = game_state["num_players"]
-        self.num_turns = game_state["num_turns"]
-        self.num_rounds = game_state["num_rounds"]
+        self.__max_players = game_state.num_players
+        self.num_turns = game_state.num_turns
+        self.num_rounds = game_state.num_rounds
 
-        for idx in game_state["player_result_points"].keys():
-            self.__player_wins[int(idx)] = 0
+        for idx in game_state.player_result_points.keys():
+            self.__player_wins[idx] = 0
 
         for p in self.__players_in_game.values():
             if not isinstance(p, RemotePlayer) or not p.is_observer:
                 p.start()
 
         self.__update_round()
+        self.game_started.set()
 
     def __wait_for_all_players(self) -> None:
-        game_state: dict = self.__info_client.game_state()
+        wait_start = time.perf_counter()
 
         # Connect local players
         self.__connect_local_players()
 
-        while len(game_state["players"]) != game_state["num_players"]:
-            game_state: dict = self.__info_client.game_state()
-            game_map: dict = self.__info_client.map()
+        # Terrain is fetched once, after that only the roster is watched
+        game_map: MapInfo = self.__hub.map()
+        roster: Optional[tuple] = None
+        delay: float = LOBBY_POLL_MIN_DELAY
 
-            self.add_remote_players(game_state["players"])
-            self.add_remote_players(game_state["observers"])
-            self.map = Map(game_map, game_state, self.__players_in_game)
+        while True:
+            game_state: GameState = self.__hub.refresh()
+            new_roster = self.__roster(game_state)
+
+            if new_roster != roster:
+                roster = new_roster
+                delay = LOBBY_POLL_MIN_DELAY
+
+                self.add_remote_players(game_state.players)
+                self.add_remote_players(game_state.observers)
+                self.__update_lobby_map(game_map, game_state)
+            else:
+                delay = min(delay * 2, LOBBY_POLL_MAX_DELAY)
+
+            if len(game_state.players) == game_state.num_players:
+                break
+
+            time.sleep(delay)
+
+        self.lobby_wait_time = time.perf_counter() - wait_start
+        print(f"All players joined in {self.lobby_wait_time:.2f}s")
+
+    @staticmethod
+    def __roster(game_state: GameState) -> tuple:
+        return (tuple(sorted(p.idx for p in game_state.players)),
+                tuple(sorted(p.idx for p in game_state.observers)))
 
-            time.sleep(0.1)
+    # Grid of the map once there is one, game states decoded with it carry the map's own hexes
+    def __grid(self) -> Optional[HexGrid]:
+        return self.map.grid if self.map is not None else None
+
+    def __update_lobby_map(self, game_map: MapInfo, game_state: GameState) -> None:
+        for player in self.__players_in_game.values():
+            player.round_reset()
+
+        if self.map is None:
+            self.map = Map(game_map, game_state, self.__players_in_game)
+            self.map_ready.set()
+        else:
+            self.map.new_round(game_state, self.__players_in_game)
 
     def __update_round(self) -> None:
         self.__round_started = True
 
-        game_map = self.__info_client.map()
-        game_state = self.__info_client.game_state()
+        game_state = self.__hub.state(self.__grid())
 
-        self.current_round = game_state["current_round"]
+        self.current_round = game_state.current_round
         for player in self.__players_in_game.values():
             player.round_reset()
 
-        self.map = Map(game_map, game_state, self.__players_in_game)
+        # Terrain does not change between rounds, so the map is only fetched once per game
+        if self.map is None:
+            self.map = Map(self.__hub.map(), game_state, self.__players_in_game)
+            self.map_ready.set()
+        else:
+            self.map.new_round(game_state, self.__players_in_game)
+
+        self.round_started.set()
 
         for player in self.__players_in_game.values():
             player.round_update(self.map)
 
     def __update_turn(self) -> None:
-        game_state = self.__info_client.game_state()
+        game_state = self.__hub.state(self.__grid())
 
-        self.current_turn = game_state["current_turn"]
-        self.__current_player_idx = game_state["current_player_idx"]
+        self.current_turn = game_state.current_turn
+        self.__current_player_idx = game_state.current_player_idx
 
         print()
         if self.__current_player_idx != 0:
@@ -180,27 +243,36 @@ class Game(Thread):
         self.map.update_map(game_state)
 
         # Check if round/game is over
-        if game_state["finished"]:
-            win_points: dict = game_state["player_result_points"]
+        if game_state.finished:
+            win_points: Mapping[int, int] = game_state.player_result_points
             for player_id in win_points.keys():
-                self.__players_in_game[int(player_id)].set_win_points(win_points[player_id])
+                self.__players_in_game[player_id].set_win_points(win_points[player_id])
 
-            self.__winner = game_state["winner"]
+            self.__winner = game_state.winner
             if self.__winner:
                 self.__player_wins[self.__winner] += 1
             self.__round_result()
 
-            if game_state["current_round"] == self.num_rounds:
+            if game_state.current_round == self.num_rounds:
                 self.running = False
                 for player in self.__players_in_game.values():
                     player.stop_player()
             else:
                 self.__round_started = False
+                self.round_started.clear()
 
     def __end_game(self) -> None:
-        self.__game_result()
-        self.__info_client.logout()
-        self.__info_client.disconnect()
+        try:
+            self.__game_result()
+            self.__info_client.logout()
+            print(f"Info client: {self.__info_client.stats.summary()}")
+            print(f"Info client: {self.__hub.summary()}")
+            print(f"Connections: {self.__pool.stats.summary()}")
+            self.__info_client.disconnect()
+        finally:
+            if self.map is not None:
+                self.map.close()
+            self.game_over.set()
 
     def __round_result(self) -> None:
         print()
@@ -235,9 +307,8 @@ class Game(Thread):
             self.__connect(player)
 
     def __connect(self, player: Player) -> None:
-        game_client = ServerConnection()
-        player_info: dict = game_client.login(player.name, player.password, self.__name, self.num_turns,
-                                              self.__max_players, player.is_observer, self.__is_full)
+        game_client, player_info = self.__pool.login(player.name, player.password, self.__name, self.num_turns,
+                                                     self.__max_players, player.is_observer, self.__is_full)
         player.add(player_info, game_client)
 
         self.__players_in_game[player.id] = player
@@ -1,5 +1,6 @@
 import pygame
 from pygame import Surface
+from threading import Event
 import pygame_menu
 from pygame_menu import sound
 from pygame_menu.locals import ALIGN_CENTER, POSITION_SOUTH, ALIGN_LEFT, ALIGN_RIGHT
@@ -25,6 +26,7 @@ class Menu:
         self.__main_menu.set_sound(engine, True)
         self.__end_screen.set_sound(engine, True)
         self.__end_screen.disable()
+        self.__loading_menu.disable()
 
     def __create_menus(self) -> None:
         self.__create_options_menu()
@@ -32,6 +34,7 @@ class Menu:
         self.__create_join_game_menu()
         self.__create_local_multiplayer_game_menu()
         self.__create_main_menu()
+        self.__create_loading_menu()
         self.__create_end_screen()
 
     def __create_main_menu(self) -> None:
@@ -324,6 +327,9 @@ class Menu:
     def is_end_screen_enabled(self) -> bool:
         return self.__end_screen.is_enabled()
 
+    def is_loading_screen_enabled(self) -> bool:
+        return self.__loading_menu.is_enabled()
+
     def draw(self, screen: Surface) -> None:
         if self.__main_menu.is_enabled():
             self.__main_menu.draw(screen)
@@ -332,20 +338,40 @@ class Menu:
         if self.__end_screen.is_enabled():
             self.__end_screen.draw(screen)
 
+    def draw_loading_screen(self, screen: Surface) -> None:
+        if self.__loading_menu.is_enabled():
+            self.__loading_menu.draw(screen)
+
     def update(self, events: list[pygame.event.Event]) -> None:
         self.__main_menu.update(events)
 
     def update_end_screen(self, events: list[pygame.event.Event]) -> None:
         self.__end_screen.update(events)
 
+    def update_loading_screen(self, events: list[pygame.event.Event]) -> None:
+        self.__loading_menu.update(events)
+
+    # Keeps the loading screen up until the event is set or the timeout runs out
+    def wait_loading(self, ready: Event, timeout: float) -> bool:
+        if ready.wait(timeout):
+            self.disable_loading_screen()
+            return True
+        return False
+
     def disable(self) -> None:
         self.__main_menu.disable()
 
     def disable_end_screen(self) -> None:
         self.__end_screen.disable()
 
+    def disable_loading_screen(self) -> None:
+        self.__loading_menu.disable()
+
     def enable(self) -> None:
         self.__main_menu.enable()
 
     def enable_end_screen(self) -> None:
         self.__end_screen.enable()
+
+    def enable_loading_screen(self) -> None:
+        self.__loading_menu.enable()
@@ -5,6 +5,7 @@ from pygame.sprite import Group
 from typing import Optional
 import queue
 
+from src.client.messages import GameState
 from src.map.hex import Hex
 from src.vehicles.tank import Tank
 from src.constants import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, BASE_COLOR, OBSTACLE_COLOR, HP_COLOR, RED, \
@@ -12,21 +13,27 @@ from src.constants import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, BASE_COLOR,
 
 
 class Painter:
-    def __init__(self, game_map: dict, players: list):
+    def __init__(self, game_map: dict):
         self.screen: Optional[Surface] = None
         self.__font_size: int = 21
         self.__font: Font = pygame.font.Font("src/assets/screen/BF_Modernista-Regular.ttf", self.__font_size)
         self.__map: dict[Hex, dict] = game_map
-        self.__players: list = players
+        self.__players: list = []
 
-        self.__tanks: dict[int, Tank] = {d["tank"].id: d["tank"]
-                                         for d in self.__map.values() if d["tank"] is not None}
+        self.__tanks: dict[int, Tank] = {}
         self.__images: dict[str, Surface] = {}
         self.explosion_group: Group = Group()
         self.__shoot_animations: queue = queue.Queue()
 
         self.__load_images()
 
+    # Images and fonts are kept, only round data is replaced
+    def reset(self, tanks: dict[int, Tank], players: list) -> None:
+        self.__tanks = tanks
+        self.__players = players
+        self.explosion_group.empty()
+        self.__shoot_animations = queue.Queue()
+
     def __load_images(self) -> None:
         self.__images: dict = {
             "spg": Painter.__load_image(LEGEND_ORDER[0]),
@@ -43,7 +50,10 @@ class Painter:
     def __load_image(img_path: str) -> Surface:
         return pygame.image.load(img_path).convert_alpha()
 
-    def draw(self, screen: Surface, current_turn: int, num_turns: int, current_round: int, num_rounds: int) -> None:
+    # With a game state the tanks are drawn as the server last reported them, so the picture stays consistent
+    # while player threads change the map
+    def draw(self, screen: Surface, current_turn: int, num_turns: int, current_round: int, num_rounds: int,
+             state: Optional[GameState] = None) -> None:
         self.screen = screen
         self.__draw_map()
 
@@ -59,8 +69,9 @@ class Painter:
             elif characteristics["type"] == "light_repair":
                 self.__draw_special(h, "light_repair")
 
-        self.__draw_tanks_and_spawns()
-        self.__draw_hp()
+        tanks = self.__tank_positions(state)
+        self.__draw_tanks_and_spawns(tanks)
+        self.__draw_hp(tanks)
 
         self.draw_shoot_animation()
 
@@ -97,16 +108,21 @@ class Painter:
         x, y = Hex.hex_to_pixel(h.q, h.r)
         self.screen.blit(scaled_image, (x - 14, y - 14))
 
-    def __draw_tanks_and_spawns(self) -> None:
-        for tank in self.__tanks.values():
+    # Tank, position and hp of every tank to draw; colors and types never change during a round
+    def __tank_positions(self, state: Optional[GameState]) -> list[tuple[Tank, Hex, int]]:
+        tanks = self.__tanks
+        if state is None:
+            return [(tank, tank.position, tank.hp) for tank in tanks.values()]
+        return [(tanks[v.id], v.position, v.health) for v in state.vehicles if v.id in tanks]
+
+    def __draw_tanks_and_spawns(self, tanks: list[tuple[Tank, Hex, int]]) -> None:
+        for tank, h, _ in tanks:
             self.__color_hex(tank.spawn_position, tank.spawn_color)
-            self.__draw_tank(tank)
+            self.__draw_tank(tank, h)
 
-    def __draw_tank(self, tank: Tank = None) -> None:
+    def __draw_tank(self, tank: Tank, h: Hex) -> None:
         image = self.__images[tank.type]
         scaled_image = pygame.transform.scale(image, (28, 28))
-        h = tank.position
-        # print(h)
         color = pygame.Surface(scaled_image.get_size())
         color.fill(tank.tank_color)
         scaled_image.blit(color, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
@@ -118,10 +134,10 @@ class Painter:
         pygame.draw.polygon(self.screen, color, points, 0)
         pygame.draw.polygon(self.screen, BLACK, points, 3)
 
-    def __draw_hp(self) -> None:
-        for tank in self.__tanks.values():
-            ratio_green = tank.hp * 1.0 / tank.full_hp
-            q, r = tank.position.q, tank.position.r
+    def __draw_hp(self, tanks: list[tuple[Tank, Hex, int]]) -> None:
+        for tank, h, hp in tanks:
+            ratio_green = hp * 1.0 / tank.full_hp
+            q, r = h.q, h.r
             x, y = Hex.hex_to_pixel(q, r)
             x, y = x - 9, y - 13
             line_start_g = (x, y)
@@ -0,0 +1,143 @@
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from src.constants import Terrain, tank_characteristics, CATAPULT_BONUS_RANGE
+from src.map.hex import Hex
+from src.map.hex_grid import HexGrid
+
+
+# Python int bitmasks over the dense hex index: bit i stands for grid.by_index(i)
+class Bitboards:
+    @staticmethod
+    def bit(h: Hex) -> int:
+        return 1 << h.index
+
+    @staticmethod
+    def from_hexes(hexes: Iterable[Hex]) -> int:
+        mask = 0
+        for h in hexes:
+            mask |= 1 << h.index
+        return mask
+
+    @staticmethod
+    def indexes(mask: int) -> Iterator[int]:
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    @staticmethod
+    def to_hexes(grid: HexGrid, mask: int) -> list[Hex]:
+        return [grid.by_index(i) for i in Bitboards.indexes(mask)]
+
+    @staticmethod
+    def popcount(mask: int) -> int:
+        return mask.bit_count()
+
+    # Boolean array of length size, element i is bit i of the mask
+    @staticmethod
+    def to_array(mask: int, size: int) -> np.ndarray:
+        raw = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little")[:size].astype(bool)
+
+
+# Terrain bitboards and per-hex movement and firing masks, built once per map
+class StaticBitboards:
+    def __init__(self, grid: HexGrid, terrain: bytearray, firing) -> None:
+        self.__grid: HexGrid = grid
+        self.__terrain_masks: dict[Terrain, int] = {t: 0 for t in Terrain}
+        for h in grid:
+            self.__terrain_masks[Terrain(terrain[h.index])] |= 1 << h.index
+
+        obstacles = self.__terrain_masks[Terrain.OBSTACLE]
+        self.__passable: int = ((1 << len(grid)) - 1) & ~obstacles
+
+        # On-grid and passable neighbors of every hex
+        self.__adjacent: list[int] = [Bitboards.from_hexes(h.neighbors) for h in grid]
+        self.__neighborhoods: list[int] = [mask & self.__passable for mask in self.__adjacent]
+
+        self.__firing: dict[tuple[str, int], list[int]] = {}
+        for vehicle_type in tank_characteristics:
+            for bonus in range(CATAPULT_BONUS_RANGE + 1):
+                self.__firing[(vehicle_type, bonus)] = [Bitboards.from_hexes(firing.targets(h, vehicle_type, bonus))
+                                                       for h in grid]
+
+    def terrain(self, terrain: Terrain) -> int:
+        return self.__terrain_masks[terrain]
+
+    @property
+    def obstacles(self) -> int:
+        return self.__terrain_masks[Terrain.OBSTACLE]
+
+    @property
+    def base(self) -> int:
+        return self.__terrain_masks[Terrain.BASE]
+
+    @property
+    def passable(self) -> int:
+        return self.__passable
+
+    def adjacent(self, h: Hex) -> int:
+        return self.__adjacent[h.index]
+
+    def neighborhood(self, h: Hex) -> int:
+        return self.__neighborhoods[h.index]
+
+    def obstacles_around(self, h: Hex) -> int:
+        return (self.__adjacent[h.index] & self.obstacles).bit_count()
+
+    def firing(self, h: Hex, vehicle_type: str, bonus_range: int = 0) -> int:
+        return self.__firing[(vehicle_type, bonus_range)][h.index]
+
+    # Hexes within steps moves of the mask, walking around obstacles
+    def expand(self, mask: int, steps: int) -> int:
+        reached = mask
+        frontier = mask
+        neighborhoods = self.__neighborhoods
+        for _ in range(steps):
+            grown = 0
+            for i in Bitboards.indexes(frontier):
+                grown |= neighborhoods[i]
+            frontier = grown & ~reached
+            if not frontier:
+                break
+            reached |= frontier
+        return reached
+
+
+# Occupancy bitboards of a round, kept up to date on every move, shot and respawn
+class DynamicBitboards:
+    def __init__(self, player_ids: Iterable[int]) -> None:
+        self.__players: dict[int, int] = {player_id: 0 for player_id in player_ids}
+        self.__occupied: int = 0
+        self.__spawn: int = 0
+
+    @property
+    def occupied(self) -> int:
+        return self.__occupied
+
+    @property
+    def spawn(self) -> int:
+        return self.__spawn
+
+    def player(self, player_id: int) -> int:
+        return self.__players.get(player_id, 0)
+
+    def add_spawn(self, h: Hex) -> None:
+        self.__spawn |= 1 << h.index
+
+    # Moves a tank of the player from old (None for a tank that has just appeared) to new. occupant is the player
+    # of a tank that has already moved onto old, old stays occupied by it.
+    def move(self, player_id: int, old: Optional[Hex], new: Hex, occupant: Optional[int] = None) -> None:
+        if old is not None and old.index >= 0:
+            bit = 1 << old.index
+            self.__players[player_id] = self.__players.get(player_id, 0) & ~bit
+            if occupant is None:
+                self.__occupied &= ~bit
+            else:
+                self.__players[occupant] = self.__players.get(occupant, 0) | bit
+        if new.index >= 0:
+            bit = 1 << new.index
+            self.__players[player_id] = self.__players.get(player_id, 0) | bit
+            self.__occupied |= bit
@@ -0,0 +1,129 @@
+from types import MappingProxyType
+from typing import Optional, Mapping
+
+from src.client.messages import GameState
+from src.constants import Terrain, CATAPULT_CHARGES
+from src.map.hex import Hex
+from src.map.static_map import StaticMap
+from src.map.bitboards import DynamicBitboards
+from src.vehicles.tank import Tank
+
+
+# Per-round state of a map: tanks, their positions and what has been used up
+class DynamicState:
+    def __init__(self, static_map: StaticMap, game_state: GameState, players_in_game: dict) -> None:
+        self.__tanks: dict[int, Tank] = {}
+        self.__tank_positions: dict[int, Hex] = {}
+        self.__occupancy: dict[Hex, Tank] = {}
+        self.__occupancy_version: int = 0
+        self.__catapult: dict[Hex, int] = {h: CATAPULT_CHARGES for h in static_map.hexes(Terrain.CATAPULT)}
+        self.__shoot_actions: dict[int, list] = {}
+        self.__players: list = [player for player in players_in_game.values() if not player.is_observer]
+        self.__spawn: tuple[Hex, ...] = ()
+        self.__spawn_set: frozenset[Hex] = frozenset()
+        self.__bitboards: DynamicBitboards = DynamicBitboards(p.id for p in self.__players)
+
+        self.__initialize(static_map, game_state, players_in_game)
+
+    def __initialize(self, static_map: StaticMap, game_state: GameState, players_in_game: dict) -> None:
+        spawn: list[Hex] = []
+
+        for p in self.__players:
+            self.__shoot_actions[p.id] = []
+
+        for vehicle in game_state.vehicles:
+            player = players_in_game[vehicle.player_id]
+            spawn_position = static_map.grid.intern(vehicle.spawn_position)
+            tank = Tank(vehicle.id, vehicle, spawn_position, player.tank_color, player.spawn_color)
+            self.__tanks[vehicle.id] = tank
+            self.place(tank, spawn_position)
+            player.add_tank(tank)
+            spawn.append(spawn_position)
+            self.__bitboards.add_spawn(spawn_position)
+
+        for player in self.__players:
+            player.reorder()
+
+        self.__spawn = tuple(spawn)
+        self.__spawn_set = frozenset(spawn)
+
+    @property
+    def tanks(self) -> dict[int, Tank]:
+        return self.__tanks
+
+    @property
+    def tank_positions(self) -> dict[int, Hex]:
+        return self.__tank_positions
+
+    # Hex -> tank standing on it
+    @property
+    def occupancy(self) -> Mapping[Hex, Tank]:
+        return MappingProxyType(self.__occupancy)
+
+    def tank_at(self, h: Hex) -> Optional[Tank]:
+        return self.__occupancy.get(h)
+
+    def is_occupied(self, h: Hex) -> bool:
+        return h in self.__occupancy
+
+    # Grows every time a tank changes its hex
+    @property
+    def occupancy_version(self) -> int:
+        return self.__occupancy_version
+
+    # Occupancy bitboards, updated together with the occupancy index
+    @property
+    def bitboards(self) -> DynamicBitboards:
+        return self.__bitboards
+
+    @property
+    def catapult(self) -> dict[Hex, int]:
+        return self.__catapult
+
+    @property
+    def shoot_actions(self) -> dict[int, list]:
+        return self.__shoot_actions
+
+    @property
+    def players(self) -> list:
+        return self.__players
+
+    @property
+    def spawn(self) -> tuple[Hex, ...]:
+        return self.__spawn
+
+    @property
+    def spawn_set(self) -> frozenset[Hex]:
+        return self.__spawn_set
+
+    def __third_player(self, id1: int, id2: int) -> Optional[int]:
+        for p in self.__players:
+            if p.id != id1 and p.id != id2:
+                return p.id
+
+        return None
+
+    # Neutrality rule: can't shoot a player that didn't attack us and was attacked by the third player
+    def is_neutral(self, shooter_player_id: int, target_player_id: int) -> bool:
+        id3 = self.__third_player(shooter_player_id, target_player_id)
+        if not id3:
+            return False
+        if shooter_player_id in self.__shoot_actions[target_player_id] \
+                or target_player_id not in self.__shoot_actions[id3]:
+            return False
+        else:
+            return True
+
+    # Keeps tank positions and the occupancy index in sync
+    def place(self, tank: Tank, coord: Hex) -> None:
+        vacated = self.__tank_positions.get(tank.id)
+        # Another tank may have been placed on the old hex first, e.g. when a turn's moves are replayed out of order
+        occupant = self.__occupancy.get(vacated) if vacated is not None else None
+        if occupant is tank:
+            del self.__occupancy[vacated]
+            occupant = None
+
+        self.__tank_positions[tank.id] = coord
+        self.__occupancy[coord] = tank
+        self.__bitboards.move(tank.player_id, vacated, coord, occupant.player_id if occupant is not None else None)
+        self.__occupancy_version += 1
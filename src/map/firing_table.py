@@ -0,0 +1,77 @@
+import numpy as np
+
+from src.constants import tank_characteristics, CATAPULT_BONUS_RANGE
+from src.map.hex import Hex
+from src.map.hex_grid import HexGrid
+
+
+# On-grid targets of every vehicle type from every hex, with and without the catapult bonus
+class FiringTable:
+    STRAIGHT_SHOOTERS = ("at_spg",)
+
+    def __init__(self, grid: HexGrid, obstacles: frozenset[Hex]) -> None:
+        self.__grid: HexGrid = grid
+        self.__obstacles: frozenset[Hex] = obstacles
+        self.__targets: dict[tuple[str, int], list[tuple[Hex, ...]]] = {}
+        self.__target_sets: dict[tuple[str, int], list[frozenset[Hex]]] = {}
+        self.__rays: dict[tuple[str, int], list[tuple[tuple[Hex, ...], ...]]] = {}
+        self.__masks: dict[tuple[str, int], np.ndarray] = {}
+
+        for vehicle_type, characteristics in tank_characteristics.items():
+            for bonus in range(CATAPULT_BONUS_RANGE + 1):
+                min_range = characteristics["min_range"]
+                max_range = characteristics["max_range"] + bonus
+                if vehicle_type in FiringTable.STRAIGHT_SHOOTERS:
+                    rays = [self.__build_rays(h, min_range, max_range) for h in grid]
+                    targets = [tuple(coord for ray in hex_rays for coord in ray) for hex_rays in rays]
+                    self.__rays[(vehicle_type, bonus)] = rays
+                else:
+                    targets = [self.__build_targets(h, min_range, max_range) for h in grid]
+                self.__targets[(vehicle_type, bonus)] = targets
+                self.__target_sets[(vehicle_type, bonus)] = [frozenset(t) for t in targets]
+                self.__masks[(vehicle_type, bonus)] = self.__build_mask(targets)
+
+    def targets(self, h: Hex, vehicle_type: str, bonus_range: int = 0) -> tuple[Hex, ...]:
+        return self.__targets[(vehicle_type, bonus_range)][h.index]
+
+    def target_set(self, h: Hex, vehicle_type: str, bonus_range: int = 0) -> frozenset[Hex]:
+        return self.__target_sets[(vehicle_type, bonus_range)][h.index]
+
+    # One ray per direction, cut at the first obstacle; only for vehicles that shoot in straight lines
+    def rays(self, h: Hex, vehicle_type: str, bonus_range: int = 0) -> tuple[tuple[Hex, ...], ...]:
+        return self.__rays[(vehicle_type, bonus_range)][h.index]
+
+    # masks[shooter.index, target.index] is True if the shot is possible
+    def mask(self, vehicle_type: str, bonus_range: int = 0) -> np.ndarray:
+        return self.__masks[(vehicle_type, bonus_range)]
+
+    def can_hit(self, shooter_position: Hex, vehicle_type: str, bonus_range: int, target: Hex) -> bool:
+        return target in self.__target_sets[(vehicle_type, bonus_range)][shooter_position.index]
+
+    def __build_mask(self, targets: list[tuple[Hex, ...]]) -> np.ndarray:
+        size = len(self.__grid)
+        mask = np.zeros((size, size), dtype=bool)
+        for shooter, hex_targets in enumerate(targets):
+            mask[shooter, [coord.index for coord in hex_targets]] = True
+        mask.setflags(write=False)
+        return mask
+
+    def __build_targets(self, h: Hex, min_range: int, max_range: int) -> tuple[Hex, ...]:
+        targets = []
+        for radius in range(min_range, max_range + 1):
+            targets += [coord for coord in self.__grid.ring(h, radius) if coord not in self.__obstacles]
+        return tuple(targets)
+
+    def __build_rays(self, h: Hex, min_range: int, max_range: int) -> tuple[tuple[Hex, ...], ...]:
+        rays = []
+        for direction in range(6):
+            ray = []
+            coord = h
+            for distance in range(1, max_range + 1):
+                coord = coord.adjacent(direction)
+                if coord is None or coord in self.__obstacles:
+                    break
+                if distance >= min_range:
+                    ray.append(coord)
+            rays.append(tuple(ray))
+        return tuple(rays)
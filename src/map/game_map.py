@@ -1,85 +1,69 @@
-from typing import Any, Optional
+from typing import Any, Iterable, Mapping, Optional
+from threading import Lock
+import numpy as np
 from pygame import Surface
 
+from src.client.messages import GameState, MapInfo
+from src.constants import Terrain, WORKER_PROCESSES
 from src.map.hex import Hex
+from src.map.hex_grid import HexGrid
+from src.map.static_map import StaticMap
+from src.map.path_table import PathTable
+from src.map.firing_table import FiringTable
+from src.map.dynamic_state import DynamicState
+from src.map.reachability import Reachability
+from src.map.threat_map import ThreatMap
+from src.map.bitboards import StaticBitboards, DynamicBitboards
+from src.map.shared_snapshot import SharedSnapshot
 from src.gui.painter import Painter
 from src.vehicles.tank import Tank
 from src.gui.explosion import Explosion
 
 
 class Map:
-    def __init__(self, game_map: dict, game_state: dict, players_in_game: dict) -> None:
-        self.__map: dict[Hex, dict] = {}
-        self.__painter: Optional[Painter] = None
-        self.__tanks: dict[int, Tank] = {}
-        self.__tank_positions: dict[int, Hex] = {}
-
-        self.__base: list[Hex] = []
-        self.__obstacles: list[Hex] = []
-        self.__spawn: list[Hex] = []
-        self.__light_repair: list[Hex] = []
-        self.__heavy_repair: list[Hex] = []
-        self.__catapult: dict[Hex, int] = {}
-
-        self.__shoot_actions: dict[int, []] = {}
-        self.__players: list = []
-        self.__initialize_map(game_map, game_state, players_in_game)
-
-    def __initialize_map(self, game_map: dict, game_state: dict, players_in_game: dict) -> None:
-        self.__map = {h: {"type": "empty", "tank": None} for h in Hex.hex_spiral(Hex(0, 0, 0), game_map["size"])}
-
-        for idx, player in players_in_game.items():
-            if not player.is_observer:
-                self.__players.append(player)
-
-        for p in self.__players:
-            self.__shoot_actions[p.id] = []
-
-        for tank_id, tank_info in game_state["vehicles"].items():
-            player = players_in_game[tank_info["player_id"]]
-            tank = Tank(int(tank_id), tank_info, player.tank_color, player.spawn_color)
-            self.__tanks[int(tank_id)] = tank
-            player.add_tank(tank)
-            self.__map[Hex.dict_to_hex(tank_info["spawn_position"])]["tank"] = tank
-            self.__spawn.append(Hex.dict_to_hex(tank_info["spawn_position"]))
-
-        for player in players_in_game.values():
-            if not player.is_observer:
-                player.reorder()
-
-        for h, positions in game_map["content"].items():
-            for position in positions:
-                new_hex = Hex.dict_to_hex(position)
-                if h == "base":
-                    self.__map[new_hex]["type"] = "base"
-                    self.__base.append(new_hex)
-                elif h == "obstacle":
-                    self.__map[new_hex]["type"] = "obstacle"
-                    self.__obstacles.append(new_hex)
-                elif h == "light_repair":
-                    self.__map[new_hex]["type"] = "light_repair"
-                    self.__light_repair.append(new_hex)
-                elif h == "hard_repair":
-                    self.__map[new_hex]["type"] = "heavy_repair"
-                    self.__heavy_repair.append(new_hex)
-                elif h == "catapult":
-                    self.__map[new_hex]["type"] = "catapult"
-                    self.__catapult[new_hex] = 3
-        self.__painter = Painter(self.__map, self.__players)
-
-    def update_map(self, game_state: dict) -> None:
-        for tank_id, tank_info in game_state["vehicles"].items():
-            tank_id = int(tank_id)
-            self.__tank_positions[tank_id] = Hex.dict_to_hex(tank_info["position"])
-            server_position = Hex.dict_to_hex(tank_info["position"])
-            server_hp = tank_info["health"]
-            server_cp = tank_info["capture_points"]
-
-            tank = self.__tanks[tank_id]
+    def __init__(self, game_map: MapInfo, game_state: GameState, players_in_game: dict) -> None:
+        self.__static: StaticMap = StaticMap(game_map)
+        self.__state: Optional[DynamicState] = None
+        self.__painter: Painter = Painter(self.__static.cells)
+        self.__reachability: Reachability = Reachability(self.__static)
+        self.__threat_map: ThreatMap = ThreatMap(self.__static)
+
+        # Only worker processes read the snapshot, so it exists only when there are any
+        self.__snapshot: Optional[SharedSnapshot] = SharedSnapshot.create(self.__static) \
+            if WORKER_PROCESSES > 0 else None
+        self.__snapshot_current: bool = False
+        self.__mismatches: tuple[int, ...] = ()
+        # Turn and tanks of every mismatch found since each watcher last took them, by watcher
+        self.__pending_mismatches: dict[int, list[tuple[int, tuple[int, ...]]]] = {}
+        self.__mismatch_lock: Lock = Lock()
+
+        self.new_round(game_state, players_in_game)
+
+    # Terrain is kept, only tanks and per-round data are rebuilt
+    def new_round(self, game_state: GameState, players_in_game: dict) -> None:
+        self.__state = DynamicState(self.__static, game_state, players_in_game)
+        self.__painter.reset(self.__state.tanks, self.__state.players)
+        self.__mismatches = ()
+        self.__write_snapshot()
+
+    def update_map(self, game_state: GameState) -> None:
+        grid = self.__static.grid
+        mismatches = []
+        for vehicle in game_state.vehicles:
+            tank_id = vehicle.id
+            # Already interned when the state was decoded with this map's grid
+            server_position = grid.intern(vehicle.position)
+            server_hp = vehicle.health
+            server_cp = vehicle.capture_points
+
+            tank = self.__state.tanks[tank_id]
             tank_position = tank.position
             tank_hp = tank.hp
             tank_cp = tank.cp
 
+            if server_position != tank_position or server_hp != tank_hp:
+                mismatches.append(tank_id)
+
             if server_position != tank_position:
                 self.move_update_data(tank, server_position)
             if server_hp != tank_hp:
@@ -87,83 +71,215 @@ class Map:
             if server_cp != tank_cp:
                 tank.update_cp(server_cp)
 
-    def draw_map(self, screen: Surface, current_turn: int, num_turns: int, current_round: int, num_rounds: int) -> None:
-        self.__painter.draw(screen, current_turn, num_turns, current_round, num_rounds)
+        self.__mismatches = tuple(mismatches)
+        if mismatches:
+            with self.__mismatch_lock:
+                for pending in self.__pending_mismatches.values():
+                    pending.append((game_state.current_turn, self.__mismatches))
+        self.__write_snapshot()
+
+    # Tanks whose local position or hp disagreed with the server at the last update, capture points are
+    # never predicted locally
+    @property
+    def mismatches(self) -> tuple[int, ...]:
+        return self.__mismatches
+
+    # Id under which the mismatches of every later update are kept until take_mismatches is called with it
+    def watch_mismatches(self) -> int:
+        with self.__mismatch_lock:
+            watcher = len(self.__pending_mismatches)
+            self.__pending_mismatches[watcher] = []
+            return watcher
+
+    # Turn and tanks of the mismatches found since the watcher last took them, in order
+    def take_mismatches(self, watcher: int) -> list[tuple[int, tuple[int, ...]]]:
+        with self.__mismatch_lock:
+            pending = self.__pending_mismatches[watcher]
+            self.__pending_mismatches[watcher] = []
+            return pending
+
+    def __write_snapshot(self) -> None:
+        if self.__snapshot is not None:
+            self.__snapshot.write(self.__state.tanks.values())
+            self.__snapshot_current = True
+
+    # Shared-memory copy of the tanks, None if there is none or our own actions have changed the map since
+    @property
+    def snapshot(self) -> Optional[SharedSnapshot]:
+        return self.__snapshot if self.__snapshot_current else None
+
+    def close(self) -> None:
+        if self.__snapshot is not None:
+            self.__snapshot.close()
+            self.__snapshot = None
+            self.__snapshot_current = False
+
+    def draw_map(self, screen: Surface, current_turn: int, num_turns: int, current_round: int, num_rounds: int,
+                 state: Optional[GameState] = None) -> None:
+        self.__painter.draw(screen, current_turn, num_turns, current_round, num_rounds, state)
+
+    @property
+    def static(self) -> StaticMap:
+        return self.__static
+
+    @property
+    def state(self) -> DynamicState:
+        return self.__state
 
     @property
     def painter(self) -> Painter:
         return self.__painter
 
+    @property
+    def grid(self) -> HexGrid:
+        return self.__static.grid
+
+    @property
+    def paths(self) -> PathTable:
+        return self.__static.paths
+
+    @property
+    def firing(self) -> FiringTable:
+        return self.__static.firing
+
+    # Terrain, movement and firing bitboards of the map
+    @property
+    def bitboards(self) -> StaticBitboards:
+        return self.__static.bitboards
+
+    # Occupancy bitboards of the current round
+    @property
+    def occupancy_bits(self) -> DynamicBitboards:
+        return self.__state.bitboards
+
     @property
     def map(self) -> dict[Hex, dict]:
-        return self.__map
+        return self.__static.cells
 
     @property
     def tank_positions(self) -> dict[int, Hex]:
-        return self.__tank_positions
+        return self.__state.tank_positions
+
+    # Hex -> tank standing on it
+    @property
+    def occupancy(self) -> Mapping[Hex, Tank]:
+        return self.__state.occupancy
+
+    def tank_at(self, h: Hex) -> Optional[Tank]:
+        return self.__state.tank_at(h)
+
+    def is_occupied(self, h: Hex) -> bool:
+        return self.__state.is_occupied(h)
+
+    # Hexes the tank standing on start could move to with sp steps
+    def reachable(self, start: Hex, sp: int) -> frozenset[Hex]:
+        return self.__reachability.reachable(self.__state, start, sp)
+
+    def reachable_for(self, tanks: Iterable[Tank]) -> dict[int, frozenset[Hex]]:
+        return self.__reachability.reachable_for(self.__state, tanks)
+
+    # How many enemy tanks can hit each hex, indexed by Hex.index
+    def threats(self, player_id: int) -> np.ndarray:
+        return self.__threat_map.threats(self.__state, player_id)
+
+    def threat_at(self, player_id: int, h: Hex) -> int:
+        return self.__threat_map.threat_at(self.__state, player_id, h)
 
     @property
     def tanks(self) -> dict[int, Tank]:
-        return self.__tanks
+        return self.__state.tanks
+
+    @property
+    def base(self) -> tuple[Hex, ...]:
+        return self.__static.hexes(Terrain.BASE)
+
+    @property
+    def obstacles(self) -> tuple[Hex, ...]:
+        return self.__static.hexes(Terrain.OBSTACLE)
+
+    @property
+    def spawn(self) -> tuple[Hex, ...]:
+        return self.__state.spawn
+
+    @property
+    def base_set(self) -> frozenset[Hex]:
+        return self.__static.hex_set(Terrain.BASE)
 
     @property
-    def base(self) -> list[Hex]:
-        return self.__base
+    def obstacle_set(self) -> frozenset[Hex]:
+        return self.__static.hex_set(Terrain.OBSTACLE)
 
     @property
-    def obstacles(self) -> list[Hex]:
-        return self.__obstacles
+    def spawn_set(self) -> frozenset[Hex]:
+        return self.__state.spawn_set
 
     @property
-    def spawn(self) -> list[Hex]:
-        return self.__spawn
+    def light_repair_set(self) -> frozenset[Hex]:
+        return self.__static.hex_set(Terrain.LIGHT_REPAIR)
+
+    @property
+    def heavy_repair_set(self) -> frozenset[Hex]:
+        return self.__static.hex_set(Terrain.HEAVY_REPAIR)
+
+    # Terrain type of every hex, indexed by Hex.index
+    @property
+    def terrain(self) -> bytearray:
+        return self.__static.terrain
+
+    def terrain_at(self, h: Hex) -> Terrain:
+        return self.__static.terrain_at(h)
 
     @property
     def players(self) -> list:
-        return self.__players
+        return self.__state.players
 
     @property
     def shoot_actions(self) -> dict[int, Any]:
-        return self.__shoot_actions
+        return self.__state.shoot_actions
 
     @property
-    def heavy_repair(self) -> list[Hex]:
-        return self.__heavy_repair
+    def heavy_repair(self) -> tuple[Hex, ...]:
+        return self.__static.hexes(Terrain.HEAVY_REPAIR)
 
     @property
-    def light_repair(self) -> list[Hex]:
-        return self.__light_repair
+    def light_repair(self) -> tuple[Hex, ...]:
+        return self.__static.hexes(Terrain.LIGHT_REPAIR)
 
     @property
     def catapult(self) -> dict[Hex, int]:
-        return self.__catapult
+        return self.__state.catapult
 
     def move_update_data(self, tank: Tank, coord: Hex) -> None:
-        self.__tank_positions[tank.id] = coord
+        self.__snapshot_current = False
+        self.__state.place(tank, coord)
         tank.update_position(coord)
 
     def shoot_update_data(self, tank: Tank, tank2: Tank) -> None:
+        self.__snapshot_current = False
         self.painter.add_shoot_animation(tank.position, tank2.position)
         if tank2.hp - tank.damage <= 0:
             self.painter.explosion_group.add(Explosion(Hex.hex_to_pixel(tank2.position.q, tank2.position.r)))
             tank.update_dp(tank.dp + tank2.full_hp)
+            self.__state.place(tank2, tank2.spawn_position)
             tank2.reset()
         else:
             tank2.update_hp(tank2.hp - tank.damage)
 
-        self.__shoot_actions[tank.player_id].append(tank2.player_id)
+        self.__state.shoot_actions[tank.player_id].append(tank2.player_id)
 
     def catapult_check(self, tank: Tank, move_coord: Hex) -> None:
-        if move_coord in self.__catapult.keys() and self.__catapult[move_coord] > 0:
+        catapult = self.__state.catapult
+        if catapult.get(move_coord, 0) > 0:
+            self.__snapshot_current = False
             tank.update_bonus_range()
-            self.__catapult[move_coord] -= 1
+            catapult[move_coord] -= 1
 
     def heavy_repair_check(self, tank: Tank, move_coord: Hex) -> None:
         tank_type = tank.type
-        if (tank_type == "heavy_tank" or tank_type == "at_spg") and move_coord in self.__heavy_repair:
+        if (tank_type == "heavy_tank" or tank_type == "at_spg") and move_coord in self.heavy_repair_set:
             tank.repair()
 
     def light_repair_check(self, tank: Tank, move_coord: Hex) -> None:
         tank_type = tank.type
-        if tank_type == "medium_tank" and move_coord in self.__light_repair:
+        if tank_type == "medium_tank" and move_coord in self.light_repair_set:
             tank.repair()
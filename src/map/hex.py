@@ -1,22 +1,41 @@
 from __future__ import annotations
 import math
+from typing import Optional
 
 from src.constants import SCREEN_WIDTH, SCREEN_HEIGHT, HEX_SIZE
 
 
 class Hex:
+    __slots__ = ("q", "r", "s", "__hash", "__index", "__adjacent", "__neighbors", "__grid")
+
     __hexDirectionVectors = [
         (1, 0, -1), (1, -1, 0), (0, -1, 1),
         (-1, 0, 1), (-1, 1, 0), (0, 1, -1),
     ]
 
     def __init__(self, q: int = None, r: int = None, s: int = None, t: tuple = None) -> None:
-        if not t:
-            self.q = q
-            self.r = r
-            self.s = s
-        else:
-            self.q, self.r, self.s = t
+        if t:
+            q, r, s = t
+
+        set_slot = object.__setattr__
+        set_slot(self, "q", q)
+        set_slot(self, "r", r)
+        set_slot(self, "s", s)
+        set_slot(self, "_Hex__hash", hash((q, r, s)))
+        set_slot(self, "_Hex__index", -1)
+        set_slot(self, "_Hex__adjacent", None)
+        set_slot(self, "_Hex__neighbors", ())
+        set_slot(self, "_Hex__grid", None)
+
+    def __setattr__(self, key: str, value) -> None:
+        raise AttributeError("Hex is immutable")
+
+    def __delattr__(self, key: str) -> None:
+        raise AttributeError("Hex is immutable")
+
+    def __reduce__(self) -> tuple:
+        # Interning is per map, so a copied hex is rebuilt as a plain coordinate
+        return Hex, (self.q, self.r, self.s)
 
     def __str__(self) -> str:
         return f"({self.q}, {self.r}, {self.s})"
@@ -25,10 +44,14 @@ class Hex:
         return f"({self.q}, {self.r}, {self.s})"
 
     def __hash__(self) -> int:
-        return hash((self.q, self.r, self.s))
+        return self.__hash
 
     def __eq__(self, other: Hex) -> bool:
-        return self.q == other.q and self.r == other.r and self.s == other.s
+        if self is other:
+            return True
+        if not isinstance(other, Hex):
+            return NotImplemented
+        return self.__hash == other.__hash and self.q == other.q and self.r == other.r and self.s == other.s
 
     def __lt__(self, other: Hex) -> bool:
         return abs(self) < abs(other)
@@ -40,21 +63,59 @@ class Hex:
         return self.q == item or self.r == item or self.s == item
 
     def __add__(self, other: Hex) -> Hex:
-        return Hex(self.q + other.q, self.r + other.r, self.s + other.s)
+        return self.__make(self.q + other.q, self.r + other.r, self.s + other.s)
 
     def __mul__(self, other: int) -> Hex:
-        return Hex(self.q * other, self.r * other, self.s * other)
+        return self.__make(self.q * other, self.r * other, self.s * other)
 
     def __abs__(self) -> int:
         return abs(self.q) + abs(self.r) + abs(self.s)
 
+    # Position of the hex in its grid, -1 if the hex is not interned
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    # On-grid neighbors of an interned hex
+    @property
+    def neighbors(self) -> tuple[Hex, ...]:
+        return self.__neighbors
+
     def is_center(self) -> bool:
         return self.q == 0 and self.r == 0 and self.s == 0
 
+    def is_interned(self) -> bool:
+        return self.__grid is not None
+
+    # Neighbor in given direction, None if it is off the grid of an interned hex
+    def adjacent(self, direction: int) -> Optional[Hex]:
+        if self.__adjacent is not None:
+            return self.__adjacent[direction]
+        dq, dr, ds = Hex.__hexDirectionVectors[direction]
+        return Hex(self.q + dq, self.r + dr, self.s + ds)
+
+    def _bind(self, grid, index: int, adjacent: tuple[Optional[Hex], ...]) -> None:
+        set_slot = object.__setattr__
+        set_slot(self, "_Hex__grid", grid)
+        set_slot(self, "_Hex__index", index)
+        set_slot(self, "_Hex__adjacent", adjacent)
+        set_slot(self, "_Hex__neighbors", tuple(h for h in adjacent if h is not None))
+
+    def __make(self, q: int, r: int, s: int) -> Hex:
+        if self.__grid is not None:
+            h = self.__grid.get(q, r, s)
+            if h is not None:
+                return h
+        return Hex(q, r, s)
+
     @staticmethod
     def dict_to_hex(data: dict) -> Hex:
         return Hex(data['x'], data['y'], data['z'])
 
+    @staticmethod
+    def direction_vectors() -> list[tuple[int, int, int]]:
+        return Hex.__hexDirectionVectors
+
     @staticmethod
     def __hex_direction(direction: int) -> Hex:
         q, r, s = Hex.__hexDirectionVectors[direction]
@@ -62,7 +123,11 @@ class Hex:
 
     @staticmethod
     def hex_neighbor(h: Hex, direction: int) -> Hex:
-        return h + Hex.__hex_direction(direction)
+        neighbor = h.adjacent(direction)
+        if neighbor is None:
+            dq, dr, ds = Hex.__hexDirectionVectors[direction]
+            return Hex(h.q + dq, h.r + dr, h.s + ds)
+        return neighbor
 
     # Returns a list of a hexes that are in a ring on certain radius
     @staticmethod
@@ -95,7 +160,19 @@ class Hex:
 
     @staticmethod
     def distance(h1: Hex, h2: Hex) -> int:
-        return int((abs(h1.q - h2.q) + abs(h1.r - h2.r) + abs(h1.s - h2.s)) / 2)
+        return (abs(h1.q - h2.q) + abs(h1.r - h2.r) + abs(h1.s - h2.s)) // 2
+
+    # Direction index of the straight line from h1 to h2, None if they are not on one
+    @staticmethod
+    def direction(h1: Hex, h2: Hex) -> Optional[int]:
+        d = Hex.distance(h1, h2)
+        if d == 0:
+            return None
+        delta = (h2.q - h1.q, h2.r - h1.r, h2.s - h1.s)
+        for direction, (dq, dr, ds) in enumerate(Hex.__hexDirectionVectors):
+            if delta == (dq * d, dr * d, ds * d):
+                return direction
+        return None
 
     @staticmethod
     def get_center(h: Hex) -> list[tuple]:
@@ -0,0 +1,59 @@
+from typing import Optional, Iterator
+
+from src.map.hex import Hex
+
+
+# Intern table of a single map: every on-grid coordinate exists exactly once
+class HexGrid:
+    def __init__(self, size: int) -> None:
+        self.__size: int = size
+        self.__hexes: list[Hex] = Hex.hex_spiral(Hex(0, 0, 0), size)
+        self.__table: dict[tuple[int, int, int], Hex] = {(h.q, h.r, h.s): h for h in self.__hexes}
+
+        for idx, h in enumerate(self.__hexes):
+            adjacent = tuple(self.__table.get((h.q + dq, h.r + dr, h.s + ds))
+                             for dq, dr, ds in Hex.direction_vectors())
+            h._bind(self, idx, adjacent)
+
+    def __len__(self) -> int:
+        return len(self.__hexes)
+
+    def __iter__(self) -> Iterator[Hex]:
+        return iter(self.__hexes)
+
+    def __contains__(self, h: Hex) -> bool:
+        return (h.q, h.r, h.s) in self.__table
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def hexes(self) -> list[Hex]:
+        return self.__hexes
+
+    def get(self, q: int, r: int, s: int) -> Optional[Hex]:
+        return self.__table.get((q, r, s))
+
+    # Returns the interned instance of h, or h itself if it is off the grid
+    def intern(self, h: Hex) -> Hex:
+        return self.__table.get((h.q, h.r, h.s), h)
+
+    def dict_to_hex(self, data: dict) -> Hex:
+        key = (data['x'], data['y'], data['z'])
+        h = self.__table.get(key)
+        return h if h is not None else Hex(t=key)
+
+    def by_index(self, index: int) -> Hex:
+        return self.__hexes[index]
+
+    # Returns on-grid hexes that are in a ring on certain radius
+    def ring(self, center: Hex, radius: int) -> list[Hex]:
+        results = []
+        table = self.__table
+        for h in Hex.hex_ring(center, radius):
+            interned = table.get((h.q, h.r, h.s))
+            if interned is not None:
+                results.append(interned)
+
+        return results
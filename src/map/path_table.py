@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.constants import PATH_TABLE_CACHE_DIR
+from src.map.hex import Hex
+from src.map.hex_grid import HexGrid
+
+
+# Obstacle-aware shortest paths between every pair of hexes, indexed by Hex.index
+class PathTable:
+    UNREACHABLE = 255
+    NO_HOP = 255
+
+    def __init__(self, grid: HexGrid, obstacles: frozenset[Hex], cache_key: Optional[str] = None) -> None:
+        self.__grid: HexGrid = grid
+        size = len(grid)
+
+        # adjacency[d][i] is the index of the passable neighbor of hex i in direction d, or size if there is none
+        self.__adjacency: np.ndarray = np.full((6, size), size, dtype=np.int32)
+        passable = np.ones(size, dtype=bool)
+        for h in grid:
+            passable[h.index] = h not in obstacles
+        for h in grid:
+            for direction in range(6):
+                neighbor = h.adjacent(direction)
+                if neighbor is not None and passable[neighbor.index] and passable[h.index]:
+                    self.__adjacency[direction, h.index] = neighbor.index
+
+        self.__neighbors: list[tuple[int, ...]] = [tuple(int(i) for i in self.__adjacency[:, idx] if i != size)
+                                                   for idx in range(size)]
+
+        self.__distances: Optional[np.ndarray] = None
+        self.__next_hops: Optional[np.ndarray] = None
+        self.__within: dict[tuple[int, int], tuple[int, ...]] = {}
+
+        if cache_key is None or not self.__load(cache_key, size):
+            self.__build(passable)
+            if cache_key is not None:
+                self.__save(cache_key)
+
+    @staticmethod
+    def payload_key(game_map: dict) -> str:
+        return hashlib.sha256(json.dumps(game_map, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @property
+    def distances(self) -> np.ndarray:
+        return self.__distances
+
+    @property
+    def next_hops(self) -> np.ndarray:
+        return self.__next_hops
+
+    # Indexes of the passable neighbors of a passable hex
+    def passable_neighbors(self, index: int) -> tuple[int, ...]:
+        return self.__neighbors[index]
+
+    # Indexes of the hexes at most steps moves away from a hex, the hex itself excluded
+    def within(self, index: int, steps: int) -> tuple[int, ...]:
+        result = self.__within.get((index, steps))
+        if result is None:
+            row = self.__distances[index]
+            result = tuple(int(i) for i in np.flatnonzero((row > 0) & (row <= steps)))
+            self.__within[(index, steps)] = result
+        return result
+
+    def distance(self, start: Hex, finish: Hex) -> int:
+        return int(self.__distances[start.index, finish.index])
+
+    def is_reachable(self, start: Hex, finish: Hex) -> bool:
+        return self.__distances[start.index, finish.index] != PathTable.UNREACHABLE
+
+    def next_hop(self, start: Hex, finish: Hex) -> Optional[Hex]:
+        direction = self.__next_hops[start.index, finish.index]
+        if direction == PathTable.NO_HOP:
+            return None
+        return start.adjacent(int(direction))
+
+    # Shortest path without the start hex, None if finish can't be reached
+    def path(self, start: Hex, finish: Hex) -> Optional[list[Hex]]:
+        if not self.is_reachable(start, finish):
+            return None
+
+        path = []
+        current = start
+        target = finish.index
+        next_hops = self.__next_hops
+        while current.index != target:
+            current = current.adjacent(int(next_hops[current.index, target]))
+            path.append(current)
+
+        return path
+
+    # Reachable candidates sorted by path length from start
+    def closest(self, start: Hex, candidates: Iterable[Hex]) -> list[Hex]:
+        row = self.__distances[start.index]
+        reachable = [h for h in candidates if row[h.index] != PathTable.UNREACHABLE]
+        reachable.sort(key=lambda h: row[h.index])
+        return reachable
+
+    def __build(self, passable: np.ndarray) -> None:
+        size = len(passable)
+        unreachable = PathTable.UNREACHABLE
+
+        # Breadth-first search from every hex at once, one row per source
+        distances = np.full((size, size), unreachable, dtype=np.uint8)
+        frontier = np.zeros((size, size + 1), dtype=bool)
+        sources = np.flatnonzero(passable)
+        distances[sources, sources] = 0
+        frontier[sources, sources] = True
+
+        step = 0
+        while frontier.any():
+            step += 1
+            reached = np.zeros((size, size), dtype=bool)
+            for direction in range(6):
+                reached |= frontier[:, self.__adjacency[direction]]
+            reached &= distances == unreachable
+            distances[reached] = step
+            frontier[:, :size] = reached
+
+        # Direction of the first step of some shortest path from row hex to column hex
+        next_hops = np.full((size, size), PathTable.NO_HOP, dtype=np.uint8)
+        padded = np.vstack([distances, np.full((1, size), unreachable, dtype=np.uint8)]).astype(np.int16)
+        wide = distances.astype(np.int16)
+        movable = (wide > 0) & (wide != unreachable)
+        for direction in range(6):
+            closer = movable & (padded[self.__adjacency[direction]] == wide - 1) & (next_hops == PathTable.NO_HOP)
+            next_hops[closer] = direction
+
+        self.__distances = distances
+        self.__next_hops = next_hops
+
+    def __cache_path(self, cache_key: str) -> str:
+        return os.path.join(PATH_TABLE_CACHE_DIR, f"{cache_key}.npz")
+
+    def __load(self, cache_key: str, size: int) -> bool:
+        try:
+            with np.load(self.__cache_path(cache_key)) as data:
+                distances, next_hops = data["distances"], data["next_hops"]
+        # A file cut short by an interrupted write is rebuilt like a missing one
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile, zlib.error):
+            return False
+
+        if distances.shape != (size, size) or next_hops.shape != (size, size):
+            return False
+
+        self.__distances = distances.astype(np.uint8, copy=False)
+        self.__next_hops = next_hops.astype(np.uint8, copy=False)
+        return True
+
+    def __save(self, cache_key: str) -> None:
+        try:
+            os.makedirs(PATH_TABLE_CACHE_DIR, exist_ok=True)
+            # Written aside and moved into place, so readers never see a partial file
+            fd, temp_path = tempfile.mkstemp(suffix=".npz.tmp", dir=PATH_TABLE_CACHE_DIR)
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    np.savez_compressed(file, distances=self.__distances, next_hops=self.__next_hops)
+                os.replace(temp_path, self.__cache_path(cache_key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            print(f"Path table cache is not written: {e}")
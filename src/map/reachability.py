@@ -0,0 +1,75 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.map.hex import Hex
+from src.map.static_map import StaticMap
+from src.map.dynamic_state import DynamicState
+from src.map.bitboards import Bitboards
+from src.vehicles.tank import Tank
+
+
+# Hexes a tank can end its move on: within sp steps around obstacles, not a spawn and not occupied
+class Reachability:
+    def __init__(self, static_map: StaticMap) -> None:
+        self.__static: StaticMap = static_map
+        self.__state: Optional[DynamicState] = None
+        self.__version: int = -1
+        self.__blocked: Optional[np.ndarray] = None
+        self.__memo: dict[tuple[int, int], frozenset[Hex]] = {}
+
+    def reachable(self, state: DynamicState, start: Hex, sp: int) -> frozenset[Hex]:
+        self.__sync(state)
+
+        key = (start.index, sp)
+        result = self.__memo.get(key)
+        if result is None:
+            distances = self.__static.paths.distances[start.index]
+            mask = (distances > 0) & (distances <= sp) & ~self.__blocked
+            result = self.__to_hexes(mask)
+            self.__memo[key] = result
+
+        return result
+
+    # All tanks in one vectorized pass over the path table
+    def reachable_for(self, state: DynamicState, tanks: Iterable[Tank]) -> dict[int, frozenset[Hex]]:
+        self.__sync(state)
+
+        result: dict[int, frozenset[Hex]] = {}
+        pending: list[Tank] = []
+        for tank in tanks:
+            cached = self.__memo.get((tank.position.index, tank.sp))
+            if cached is not None:
+                result[tank.id] = cached
+            else:
+                pending.append(tank)
+
+        if pending:
+            starts = np.fromiter((t.position.index for t in pending), dtype=np.int32, count=len(pending))
+            sps = np.fromiter((t.sp for t in pending), dtype=np.uint8, count=len(pending))
+            distances = self.__static.paths.distances[starts]
+            masks = (distances > 0) & (distances <= sps[:, None]) & ~self.__blocked[None, :]
+
+            for tank, mask in zip(pending, masks):
+                hexes = self.__to_hexes(mask)
+                self.__memo[(tank.position.index, tank.sp)] = hexes
+                result[tank.id] = hexes
+
+        return result
+
+    # Memoized results only hold for one occupancy version of one round
+    def __sync(self, state: DynamicState) -> None:
+        if state is self.__state and state.occupancy_version == self.__version:
+            return
+
+        bitboards = state.bitboards
+        blocked = Bitboards.to_array(bitboards.spawn | bitboards.occupied, len(self.__static.grid))
+
+        self.__state = state
+        self.__version = state.occupancy_version
+        self.__blocked = blocked
+        self.__memo = {}
+
+    def __to_hexes(self, mask: np.ndarray) -> frozenset[Hex]:
+        grid = self.__static.grid
+        return frozenset(grid.by_index(int(i)) for i in np.flatnonzero(mask))
@@ -0,0 +1,107 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.constants import tank_characteristics, SNAPSHOT_CAPACITY
+from src.map.static_map import StaticMap
+from src.vehicles.tank import Tank
+
+
+# Tanks and terrain of a map in shared memory, laid out as fixed NumPy arrays so other processes can attach
+# without copying. The version is odd while a write is in progress and grows by two with every write.
+class SharedSnapshot:
+    TANK_TYPES = tuple(tank_characteristics)
+    TANK_FIELDS = ("id", "type", "owner", "sp", "damage", "position", "spawn", "hp", "full_hp", "cp", "dp", "bonus")
+
+    # version, tank count, tank capacity, grid size
+    __HEADER_SIZE = 4
+
+    def __init__(self, shm: SharedMemory, owner: bool) -> None:
+        self.__shm: SharedMemory = shm
+        self.__owner: bool = owner
+
+        self.__header: np.ndarray = np.ndarray((SharedSnapshot.__HEADER_SIZE,), dtype=np.int64, buffer=shm.buf)
+        capacity, grid_size = int(self.__header[2]), int(self.__header[3])
+        offset = self.__header.nbytes
+        self.__tanks: np.ndarray = np.ndarray((len(SharedSnapshot.TANK_FIELDS), capacity), dtype=np.int32,
+                                              buffer=shm.buf, offset=offset)
+        offset += self.__tanks.nbytes
+        self.__terrain: np.ndarray = np.ndarray((grid_size,), dtype=np.uint8, buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def __size(capacity: int, grid_size: int) -> int:
+        return 8 * SharedSnapshot.__HEADER_SIZE + 4 * len(SharedSnapshot.TANK_FIELDS) * capacity + grid_size
+
+    # New snapshot of the map, owned (and finally unlinked) by the calling process
+    @staticmethod
+    def create(static_map: StaticMap, capacity: int = SNAPSHOT_CAPACITY) -> "SharedSnapshot":
+        grid_size = len(static_map.grid)
+        shm = SharedMemory(create=True, size=SharedSnapshot.__size(capacity, grid_size))
+        np.ndarray((SharedSnapshot.__HEADER_SIZE,), dtype=np.int64, buffer=shm.buf)[:] = (0, 0, capacity, grid_size)
+
+        snapshot = SharedSnapshot(shm, owner=True)
+        snapshot.__terrain[:] = np.frombuffer(bytes(static_map.terrain), dtype=np.uint8)
+        return snapshot
+
+    @staticmethod
+    def attach(name: str) -> "SharedSnapshot":
+        return SharedSnapshot(SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.__shm.name
+
+    @property
+    def version(self) -> int:
+        return int(self.__header[0])
+
+    # Zero-copy views, only consistent while the version stays the same
+    @property
+    def tanks(self) -> np.ndarray:
+        return self.__tanks[:, :int(self.__header[1])]
+
+    @property
+    def terrain(self) -> np.ndarray:
+        return self.__terrain
+
+    def field(self, name: str) -> np.ndarray:
+        return self.tanks[SharedSnapshot.TANK_FIELDS.index(name)]
+
+    def is_stale(self, version: int) -> bool:
+        return self.version != version
+
+    def write(self, tanks: Iterable[Tank]) -> int:
+        tanks = list(tanks)
+        if len(tanks) > self.__tanks.shape[1]:
+            raise ValueError(f"Snapshot holds {self.__tanks.shape[1]} tanks, got {len(tanks)}")
+
+        header = self.__header
+        header[0] += 1
+        columns = self.__tanks
+        for slot, t in enumerate(tanks):
+            columns[:, slot] = (t.id, SharedSnapshot.TANK_TYPES.index(t.type), t.player_id, t.sp, t.damage,
+                                t.position.index, t.spawn_position.index, t.hp, t.full_hp, t.cp, t.dp,
+                                t.bonus_range)
+        header[1] = len(tanks)
+        header[0] += 1
+        return int(header[0])
+
+    # Consistent copy of the tank columns and the version it belongs to, None if a write keeps getting in the way
+    def read(self, attempts: int = 100) -> Optional[tuple[int, np.ndarray]]:
+        header = self.__header
+        for _ in range(attempts):
+            version = int(header[0])
+            if version % 2:
+                continue
+            tanks = self.__tanks[:, :int(header[1])].copy()
+            if int(header[0]) == version:
+                return version, tanks
+        return None
+
+    def close(self) -> None:
+        # Views have to go before the buffer can be released
+        self.__header = self.__tanks = self.__terrain = None
+        self.__shm.close()
+        if self.__owner:
+            self.__shm.unlink()
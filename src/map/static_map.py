@@ -0,0 +1,101 @@
+from typing import Optional
+
+from src.client.messages import MapInfo
+from src.constants import Terrain
+from src.map.hex import Hex
+from src.map.hex_grid import HexGrid
+from src.map.path_table import PathTable
+from src.map.firing_table import FiringTable
+from src.map.bitboards import StaticBitboards
+
+
+# Terrain of a game map, it never changes between rounds of the same game
+class StaticMap:
+    __CONTENT_TERRAIN = {
+        "base": Terrain.BASE,
+        "obstacle": Terrain.OBSTACLE,
+        "light_repair": Terrain.LIGHT_REPAIR,
+        "hard_repair": Terrain.HEAVY_REPAIR,
+        "catapult": Terrain.CATAPULT
+    }
+
+    def __init__(self, game_map: MapInfo) -> None:
+        self.__grid: HexGrid = HexGrid(game_map.size)
+        self.__cells: dict[Hex, dict] = {h: {"type": "empty"} for h in self.__grid}
+        self.__terrain: bytearray = bytearray(len(self.__grid))
+        self.__hexes: dict[Terrain, tuple[Hex, ...]] = {}
+        self.__sets: dict[Terrain, frozenset[Hex]] = {}
+
+        self.__payload: MapInfo = game_map
+        self.__key: str = PathTable.payload_key(game_map._asdict())
+
+        self.__initialize(game_map)
+        self.__paths: PathTable = PathTable(self.__grid, self.__sets[Terrain.OBSTACLE], self.__key)
+        self.__firing: FiringTable = FiringTable(self.__grid, self.__sets[Terrain.OBSTACLE])
+        self.__bitboards: StaticBitboards = StaticBitboards(self.__grid, self.__terrain, self.__firing)
+
+    def __initialize(self, game_map: MapInfo) -> None:
+        terrain_hexes: dict[Terrain, list[Hex]] = {terrain: [] for terrain in Terrain}
+
+        for h, positions in game_map.content.items():
+            terrain: Optional[Terrain] = StaticMap.__CONTENT_TERRAIN.get(h)
+            if terrain is None:
+                continue
+
+            for position in positions:
+                new_hex = self.__grid.get(*position)
+                self.__cells[new_hex]["type"] = terrain.name.lower()
+                self.__terrain[new_hex.index] = terrain
+                terrain_hexes[terrain].append(new_hex)
+
+        # Read-only list views are kept in map order, sets are used for lookups
+        self.__hexes = {terrain: tuple(hexes) for terrain, hexes in terrain_hexes.items()}
+        self.__sets = {terrain: frozenset(hexes) for terrain, hexes in terrain_hexes.items()}
+
+    # Map payload the terrain was built from, enough to rebuild it in another process
+    @property
+    def payload(self) -> MapInfo:
+        return self.__payload
+
+    # Hash of the payload, equal for equal maps
+    @property
+    def key(self) -> str:
+        return self.__key
+
+    @property
+    def grid(self) -> HexGrid:
+        return self.__grid
+
+    @property
+    def paths(self) -> PathTable:
+        return self.__paths
+
+    @property
+    def firing(self) -> FiringTable:
+        return self.__firing
+
+    @property
+    def bitboards(self) -> StaticBitboards:
+        return self.__bitboards
+
+    @property
+    def cells(self) -> dict[Hex, dict]:
+        return self.__cells
+
+    # Terrain type of every hex, indexed by Hex.index
+    @property
+    def terrain(self) -> bytearray:
+        return self.__terrain
+
+    def terrain_at(self, h: Hex) -> Terrain:
+        if h.index < 0:
+            h = self.__grid.intern(h)
+            if h.index < 0:
+                raise KeyError(h)
+        return Terrain(self.__terrain[h.index])
+
+    def hexes(self, terrain: Terrain) -> tuple[Hex, ...]:
+        return self.__hexes[terrain]
+
+    def hex_set(self, terrain: Terrain) -> frozenset[Hex]:
+        return self.__sets[terrain]
@@ -0,0 +1,54 @@
+from typing import Optional
+
+import numpy as np
+
+from src.map.hex import Hex
+from src.map.static_map import StaticMap
+from src.map.dynamic_state import DynamicState
+
+
+# Number of enemy tanks that can hit each hex, for every player, computed in one vectorized pass
+class ThreatMap:
+    def __init__(self, static_map: StaticMap) -> None:
+        self.__static: StaticMap = static_map
+        self.__state: Optional[DynamicState] = None
+        self.__key: Optional[tuple] = None
+        self.__threats: dict[int, np.ndarray] = {}
+
+    def threats(self, state: DynamicState, player_id: int) -> np.ndarray:
+        self.__sync(state)
+        return self.__threats[player_id]
+
+    def threat_at(self, state: DynamicState, player_id: int, h: Hex) -> int:
+        self.__sync(state)
+        return int(self.__threats[player_id][h.index])
+
+    # Threats only change when tanks move, catapult bonuses change or shoot actions change neutrality
+    def __sync(self, state: DynamicState) -> None:
+        tanks = state.tanks.values()
+        key = (state.occupancy_version,
+               tuple(t.bonus_range for t in tanks),
+               tuple(tuple(actions) for actions in state.shoot_actions.values()))
+        if state is self.__state and key == self.__key:
+            return
+
+        # Group shooters by firing mask so every group is a single gather and sum
+        groups: dict[tuple[str, int], list[tuple[int, int]]] = {}
+        for t in tanks:
+            groups.setdefault((t.type, t.bonus_range), []).append((t.position.index, t.player_id))
+
+        size = len(self.__static.grid)
+        threats: dict[int, np.ndarray] = {}
+        for player in state.players:
+            counts = np.zeros(size, dtype=np.uint8)
+            for (vehicle_type, bonus), shooters in groups.items():
+                positions = [position for position, shooter_id in shooters
+                             if shooter_id != player.id and not state.is_neutral(shooter_id, player.id)]
+                if positions:
+                    counts += self.__static.firing.mask(vehicle_type, bonus)[positions].sum(axis=0, dtype=np.uint8)
+            counts.setflags(write=False)
+            threats[player.id] = counts
+
+        self.__state = state
+        self.__key = key
+        self.__threats = threats
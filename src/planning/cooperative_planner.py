@@ -0,0 +1,107 @@
+import heapq
+import math
+import time
+from typing import Optional
+
+from src.constants import PLANNER_HORIZON, PLANNER_CPU_BUDGET
+from src.map.bitboards import Bitboards
+from src.map.dynamic_state import DynamicState
+from src.map.hex import Hex
+from src.map.static_map import StaticMap
+from src.planning.turn_budget import TurnBudget
+from src.vehicles.tank import Tank
+
+
+# Prioritized planning of all tanks of a player over a (hex, turn) reservation table. Tanks are planned
+# and moved in the given order, every one around the cells reserved by the tanks before it.
+class CooperativePlanner:
+    def __init__(self, static_map: StaticMap, horizon: int = PLANNER_HORIZON) -> None:
+        self.__static: StaticMap = static_map
+        self.__horizon: int = horizon
+
+    # One consistent move target per tank. A search cut short by the CPU budget or the turn deadline keeps its
+    # best cell so far, tanks left after that stay where they are.
+    def plan(self, state: DynamicState, goals: list[tuple[Tank, Hex]], budget: float = PLANNER_CPU_BUDGET,
+             turn_budget: Optional[TurnBudget] = None) -> dict[int, Hex]:
+        deadline = time.thread_time() + budget
+        grid = self.__static.grid
+
+        moving = {tank.id for tank, _ in goals}
+        blocked = state.bitboards.spawn
+        for tank in state.tanks.values():
+            if tank.id not in moving:
+                blocked |= Bitboards.bit(tank.position)
+
+        # reservations[t] holds the hexes taken at the end of turn t
+        reservations = [0] * (self.__horizon + 1)
+        # Tanks that are not planned yet may stay, so their hexes are taken on the next turn
+        pending = Bitboards.from_hexes(tank.position for tank, _ in goals)
+
+        targets: dict[int, Hex] = {}
+        for tank, goal in goals:
+            pending &= ~Bitboards.bit(tank.position)
+            cells = None
+            if time.thread_time() < deadline and not (turn_budget and turn_budget.expired()):
+                cells = self.__search(tank, goal, blocked, reservations, pending, deadline, turn_budget)
+            if cells is None:
+                cells = [tank.position.index] * (self.__horizon + 1)
+
+            for t, cell in enumerate(cells):
+                reservations[t] |= 1 << cell
+            targets[tank.id] = grid.by_index(cells[1])
+
+        return targets
+
+    # Space-time A* toward goal; falls back to the cell closest to it when the goal is out of the horizon
+    # or the search is interrupted. Returns the hex index of the tank at the end of every turn.
+    def __search(self, tank: Tank, goal: Hex, blocked: int, reservations: list[int], pending: int,
+                 deadline: float, turn_budget: Optional[TurnBudget]) -> list[int]:
+        start = tank.position.index
+        sp = tank.sp
+        horizon = self.__horizon
+        paths = self.__static.paths
+        unreachable = paths.UNREACHABLE
+        goal_distances = paths.distances[goal.index].tolist()
+        blocked &= ~(1 << start)
+
+        def turns_left(cell: int) -> float:
+            distance = goal_distances[cell]
+            return math.inf if distance == unreachable else -(-distance // sp)
+
+        queue = [(turns_left(start), 0, start)]
+        parents: dict[tuple[int, int], Optional[tuple[int, int]]] = {(0, start): None}
+        best = (turns_left(start), 0, start)
+        expansions = 0
+
+        while queue:
+            _, t, u = heapq.heappop(queue)
+            if u == goal.index:
+                best = (0, t, u)
+                break
+            if (turns_left(u), t) < best[:2]:
+                best = (turns_left(u), t, u)
+            if t == horizon:
+                continue
+
+            expansions += 1
+            if expansions % 64 == 0 and (time.thread_time() > deadline or (turn_budget and turn_budget.expired())):
+                break
+
+            taken = reservations[t + 1] | blocked | (pending if t == 0 else 0)
+            for v in paths.within(u, sp) + (u,):
+                if taken >> v & 1 or (t + 1, v) in parents:
+                    continue
+                parents[(t + 1, v)] = (t, u)
+                heapq.heappush(queue, (t + 1 + turns_left(v), t + 1, v))
+
+        _, t, u = best
+        cells = []
+        node = (t, u)
+        while node is not None:
+            cells.append(node[1])
+            node = parents[node]
+        cells.reverse()
+
+        # The tank parks on its last cell until the end of the horizon
+        cells += [u] * (horizon + 1 - len(cells))
+        return cells
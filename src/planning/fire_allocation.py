@@ -0,0 +1,126 @@
+from typing import Optional
+
+from src.constants import FIRE_KILL_VALUE, FIRE_CP_VALUE, FIRE_MAX_NODES
+from src.planning.turn_budget import TurnBudget
+from src.rules import Shot
+from src.vehicles.tank import Tank
+
+
+# Joint choice of targets for the shooters of a player. Every shooter fires one of its shots or holds, a
+# branch-and-bound search maximises the value of kills (destruction points plus the capture points denied)
+# and of damage that doesn't kill, so several tanks focus a target only when that finishes it.
+class FireAllocator:
+    def __init__(self, kill_value: int = FIRE_KILL_VALUE, cp_value: int = FIRE_CP_VALUE,
+                 max_nodes: int = FIRE_MAX_NODES) -> None:
+        self.__kill_value: int = kill_value
+        self.__cp_value: int = cp_value
+        self.__max_nodes: int = max_nodes
+
+        self.__options: list[tuple[Shot, ...]] = []
+        self.__bounds: list[int] = []
+        self.__damage: dict[int, int] = {}
+        self.__chosen: list[Optional[Shot]] = []
+        self.__best: tuple[int, int] = (0, 0)
+        self.__best_shots: list[Optional[Shot]] = []
+        self.__nodes: int = 0
+        self.__stopped: bool = False
+        self.__budget: Optional[TurnBudget] = None
+
+    # Shot of every shooter that should fire, keyed by tank id. Shooters without a shot are left free to move.
+    # A search cut short by the node limit or the turn deadline returns the best allocation found so far.
+    def allocate(self, shots: dict[Tank, list[Shot]], budget: Optional[TurnBudget] = None) -> dict[int, Shot]:
+        # Most constrained shooters first, their choices prune the others
+        shooters = sorted((tank for tank in shots if shots[tank]), key=lambda tank: len(shots[tank]))
+        if not shooters:
+            return {}
+
+        self.__options = [tuple(shots[tank]) for tank in shooters]
+        # Optimistic gain of the shooters from each position on: a shot is never worth more than killing
+        # all of its victims
+        gains = [max(sum(self.__kill(t) for t in shot.victims) for shot in options) for options in self.__options]
+        self.__bounds = [sum(gains[i:]) for i in range(len(gains) + 1)]
+
+        self.__damage = {}
+        self.__chosen = [None] * len(shooters)
+        self.__nodes = 0
+        self.__stopped = False
+        self.__budget = budget
+
+        # Greedy allocation first, so an interrupted search still has something to return
+        self.__best = (-1, 0)
+        self.__greedy()
+        self.__damage = {}
+        self.__chosen = [None] * len(shooters)
+        self.__branch(0, 0, 0)
+
+        return {tank.id: shot for tank, shot in zip(shooters, self.__best_shots) if shot is not None}
+
+    # Value of a kill: destruction points gained and capture points taken from the enemy
+    def __kill(self, tank: Tank) -> int:
+        return self.__kill_value + tank.full_hp + self.__cp_value * tank.cp
+
+    def __value(self, tank: Tank, damage: int) -> int:
+        if damage >= tank.hp:
+            return self.__kill(tank)
+        return damage
+
+    # Value added by the shot given the damage already allocated
+    def __gain(self, shot: Shot) -> int:
+        damage = shot.tank.damage
+        gain = 0
+        for t in shot.victims:
+            dealt = self.__damage.get(t.id, 0)
+            gain += self.__value(t, dealt + damage) - self.__value(t, dealt)
+        return gain
+
+    def __apply(self, shot: Shot, sign: int) -> None:
+        for t in shot.victims:
+            self.__damage[t.id] = self.__damage.get(t.id, 0) + sign * shot.tank.damage
+
+    def __greedy(self) -> None:
+        value, fired = 0, 0
+        for i, options in enumerate(self.__options):
+            shot = max(options, key=self.__gain)
+            gain = self.__gain(shot)
+            if gain > 0:
+                self.__apply(shot, 1)
+                self.__chosen[i] = shot
+                value, fired = value + gain, fired + 1
+        self.__record(value, fired)
+
+    # Ties go to the allocation that fires fewer shots
+    def __record(self, value: int, fired: int) -> None:
+        if (value, -fired) > self.__best:
+            self.__best = (value, -fired)
+            self.__best_shots = list(self.__chosen)
+
+    def __interrupted(self) -> bool:
+        self.__nodes += 1
+        if self.__nodes >= self.__max_nodes:
+            return True
+        return self.__budget is not None and self.__nodes % 64 == 0 and self.__budget.expired()
+
+    def __branch(self, i: int, value: int, fired: int) -> None:
+        if i == len(self.__options):
+            self.__record(value, fired)
+            return
+        if value + self.__bounds[i] < self.__best[0]:
+            return
+        if self.__interrupted():
+            self.__stopped = True
+            return
+
+        # Best looking shots first, holding fire last
+        for gain, shot in sorted(((self.__gain(shot), shot) for shot in self.__options[i]),
+                                 key=lambda option: -option[0]):
+            if gain <= 0:
+                break
+            self.__apply(shot, 1)
+            self.__chosen[i] = shot
+            self.__branch(i + 1, value + gain, fired + 1)
+            self.__apply(shot, -1)
+            self.__chosen[i] = None
+            if self.__stopped:
+                return
+
+        self.__branch(i + 1, value, fired)
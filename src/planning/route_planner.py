@@ -0,0 +1,132 @@
+import heapq
+import math
+from typing import Optional
+
+from src.map.bitboards import Bitboards
+from src.map.dynamic_state import DynamicState
+from src.map.hex import Hex
+from src.map.static_map import StaticMap
+from src.planning.turn_budget import TurnBudget
+
+
+# D* Lite route of one tank to a fixed goal. The search runs backwards from the goal, so when the tank moves
+# or other tanks step onto or off the route only the affected vertices are repaired on the next call.
+class RoutePlanner:
+    def __init__(self, static_map: StaticMap, goal: Hex) -> None:
+        self.__grid = static_map.grid
+        self.__paths = static_map.paths
+        self.__goal: Hex = goal
+        size = len(self.__grid)
+
+        self.__g: list[float] = [math.inf] * size
+        self.__rhs: list[float] = [math.inf] * size
+        self.__rhs[goal.index] = 0
+        self.__km: float = 0
+        self.__start: int = -1
+        self.__start_distances: list[int] = []
+        self.__blocked: int = 0
+        self.__queue: list[tuple[tuple[float, float], int]] = []
+        heapq.heappush(self.__queue, (self.__key(goal.index), goal.index))
+
+    @property
+    def goal(self) -> Hex:
+        return self.__goal
+
+    # Route from start to the goal (start excluded), empty if the goal can't be reached.
+    # When the budget runs out the repair is resumed on the next call and the static shortest path is used.
+    def plan(self, state: DynamicState, start: Hex, budget: Optional[TurnBudget] = None) -> list[Hex]:
+        self.__sync(state, start)
+        if not self.__compute(budget):
+            return self.__paths.path(start, self.__goal) or []
+        return self.__extract()
+
+    # Moves the search to the new start and re-evaluates hexes whose occupancy changed since the last call
+    def __sync(self, state: DynamicState, start: Hex) -> None:
+        if self.__start != start.index:
+            if self.__start >= 0:
+                self.__km += self.__heuristic(self.__start, start.index)
+            self.__start = start.index
+            self.__start_distances = self.__paths.distances[start.index].tolist()
+
+        free = ~(Bitboards.bit(start) | Bitboards.bit(self.__goal))
+        blocked = state.bitboards.occupied & free
+        changed = blocked ^ self.__blocked
+        self.__blocked = blocked
+
+        for v in Bitboards.indexes(changed):
+            for u in self.__paths.passable_neighbors(v):
+                self.__update_vertex(u)
+
+    def __heuristic(self, a: int, b: int) -> float:
+        distance = self.__paths.distances[a, b]
+        return math.inf if distance == self.__paths.UNREACHABLE else int(distance)
+
+    def __key(self, s: int) -> tuple[float, float]:
+        m = min(self.__g[s], self.__rhs[s])
+        if self.__start < 0:
+            return m + self.__km, m
+        h = self.__start_distances[s]
+        return m + (math.inf if h == self.__paths.UNREACHABLE else h) + self.__km, m
+
+    # Cost of stepping onto v
+    def __cost(self, v: int) -> float:
+        return math.inf if self.__blocked >> v & 1 else 1
+
+    def __update_vertex(self, u: int) -> None:
+        if u != self.__goal.index:
+            g = self.__g
+            self.__rhs[u] = min((self.__cost(s) + g[s] for s in self.__paths.passable_neighbors(u)),
+                                default=math.inf)
+        if self.__g[u] != self.__rhs[u]:
+            heapq.heappush(self.__queue, (self.__key(u), u))
+
+    # Queue entries are never removed in place, outdated ones are skipped when they surface
+    def __top(self) -> Optional[tuple[tuple[float, float], int]]:
+        queue = self.__queue
+        while queue and self.__g[queue[0][1]] == self.__rhs[queue[0][1]]:
+            heapq.heappop(queue)
+        return queue[0] if queue else None
+
+    # False if the budget ran out before the start became consistent
+    def __compute(self, budget: Optional[TurnBudget]) -> bool:
+        g, rhs = self.__g, self.__rhs
+        start = self.__start
+        steps = 0
+        while True:
+            top = self.__top()
+            if top is None or (top[0] >= self.__key(start) and rhs[start] == g[start]):
+                return True
+
+            steps += 1
+            if budget is not None and steps % 64 == 0 and budget.expired():
+                return False
+
+            k_old, u = heapq.heappop(self.__queue)
+            k_new = self.__key(u)
+            if k_old < k_new:
+                heapq.heappush(self.__queue, (k_new, u))
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for p in self.__paths.passable_neighbors(u):
+                    self.__update_vertex(p)
+            else:
+                g[u] = math.inf
+                self.__update_vertex(u)
+                for p in self.__paths.passable_neighbors(u):
+                    self.__update_vertex(p)
+
+    def __extract(self) -> list[Hex]:
+        g = self.__g
+        current = self.__start
+        if g[current] == math.inf:
+            return []
+
+        path = []
+        goal = self.__goal.index
+        while current != goal and len(path) < len(g):
+            current = min(self.__paths.passable_neighbors(current), key=lambda s: (self.__cost(s) + g[s], s))
+            if g[current] == math.inf:
+                return []
+            path.append(self.__grid.by_index(current))
+
+        return path
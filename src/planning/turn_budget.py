@@ -0,0 +1,71 @@
+import time
+from typing import NamedTuple, Optional
+
+from src.constants import TURN_PLANNING_DEADLINE
+
+
+class TurnRecord(NamedTuple):
+    used: float
+    deadline: float
+    timed_out: bool
+
+    # Planning ran past its deadline or the server ended the turn before we did
+    @property
+    def overrun(self) -> bool:
+        return self.used > self.deadline or self.timed_out
+
+
+# Wall-clock planning budget of a turn, measured from the moment the turn starts
+class TurnBudget:
+    def __init__(self, deadline: float = TURN_PLANNING_DEADLINE) -> None:
+        self.__deadline: float = deadline
+        self.__started: Optional[float] = None
+        self.__records: list[TurnRecord] = []
+
+    @property
+    def deadline(self) -> float:
+        return self.__deadline
+
+    @property
+    def records(self) -> list[TurnRecord]:
+        return self.__records
+
+    @property
+    def overruns(self) -> int:
+        return sum(1 for record in self.__records if record.overrun)
+
+    def start(self) -> None:
+        self.__started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        if self.__started is None:
+            return 0.0
+        return time.monotonic() - self.__started
+
+    # time.monotonic() value of the deadline, the clock is shared with worker processes
+    @property
+    def ends_at(self) -> float:
+        started = self.__started if self.__started is not None else time.monotonic()
+        return started + self.__deadline
+
+    @property
+    def remaining(self) -> float:
+        return max(self.__deadline - self.elapsed, 0.0)
+
+    # Planners poll this and hand in their best result so far once it is True
+    def expired(self) -> bool:
+        return self.__started is not None and self.elapsed >= self.__deadline
+
+    def record(self, used: float, timed_out: bool) -> TurnRecord:
+        record = TurnRecord(used, self.__deadline, timed_out)
+        self.__records.append(record)
+        self.__started = None
+        return record
+
+    def summary(self) -> str:
+        if not self.__records:
+            return "no turns planned"
+        used = [record.used for record in self.__records]
+        return f"{len(used)} turns, avg {sum(used) / len(used):.3f}s, max {max(used):.3f}s, " \
+               f"{self.overruns} overruns"
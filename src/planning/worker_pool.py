@@ -0,0 +1,163 @@
+import atexit
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Optional
+
+from src.client.messages import MapInfo
+from src.constants import WORKER_PROCESSES, WORKER_DEADLINE_MARGIN
+from src.map.shared_snapshot import SharedSnapshot
+from src.map.static_map import StaticMap
+from src.search import BeamSearch, SearchProblem, TankSnapshot
+
+# Search engine of a worker process, built once by _initialize and kept with its transposition table
+_search: Optional[BeamSearch] = None
+# Snapshot this worker is attached to, by shared memory name
+_snapshots: dict[str, SharedSnapshot] = {}
+
+
+def _initialize(game_map: MapInfo) -> None:
+    global _search
+    _search = BeamSearch(StaticMap(game_map))
+
+
+def _ready() -> bool:
+    return _search is not None
+
+
+def _solve(problem: SearchProblem, roots: list[tuple], deadline: float) -> tuple[float, tuple]:
+    return _search.solve(problem, lambda: time.monotonic() >= deadline, roots)
+
+
+# Same as _solve, but the tanks are read from the shared snapshot; None if it no longer has the given version
+def _solve_shared(name: str, version: int, problem: SearchProblem, roots: list[tuple],
+                  deadline: float) -> Optional[tuple[float, tuple]]:
+    snapshot = _snapshots.get(name)
+    if snapshot is None:
+        # Only the snapshot of the current game is kept attached, the ones of earlier games are unlinked by now
+        for old in list(_snapshots):
+            _snapshots.pop(old).close()
+        snapshot = _snapshots[name] = SharedSnapshot.attach(name)
+
+    read = snapshot.read()
+    if read is None or read[0] != version:
+        return None
+
+    tanks = []
+    for column in read[1].T:
+        values = dict(zip(SharedSnapshot.TANK_FIELDS, (int(value) for value in column)))
+        tanks.append(TankSnapshot(values["id"], values["owner"], SharedSnapshot.TANK_TYPES[values["type"]],
+                                  values["sp"], values["damage"], values["full_hp"], values["spawn"],
+                                  values["position"], values["hp"], values["cp"], values["dp"], values["bonus"]))
+    return _solve(problem._replace(tanks=tuple(tanks)), roots, deadline)
+
+
+# Worker processes holding a warm static map. They live until a different map is bound or the program exits,
+# so they survive turns and rounds and are shared by all players of this process.
+class WorkerPool:
+    def __init__(self, processes: int) -> None:
+        self.__processes: int = processes
+        self.__executor: Optional[ProcessPoolExecutor] = None
+        self.__map_key: Optional[str] = None
+        self.__warmup: list[Future] = []
+        self.__lock: Lock = Lock()
+
+    @property
+    def processes(self) -> int:
+        return self.__processes
+
+    def bind(self, static_map: StaticMap) -> ProcessPoolExecutor:
+        with self.__lock:
+            if self.__executor is None or self.__map_key != static_map.key:
+                self.__shutdown()
+                # Workers are spawned, forking a process that runs pygame threads is not safe
+                self.__executor = ProcessPoolExecutor(self.__processes,
+                                                      mp_context=multiprocessing.get_context("spawn"),
+                                                      initializer=_initialize, initargs=(static_map.payload,))
+                self.__map_key = static_map.key
+                # Processes are started on demand, so they are asked for work right away to warm them up
+                self.__warmup = [self.__executor.submit(_ready) for _ in range(self.__processes)]
+            return self.__executor
+
+    # Whether every worker has built its search engine for the map, a search sent earlier would wait for that
+    def ready(self, static_map: StaticMap) -> bool:
+        with self.__lock:
+            return self.__executor is not None and self.__map_key == static_map.key \
+                and all(future.done() and not future.exception() for future in self.__warmup)
+
+    # Splits the root actions over the workers and reduces the results that arrive before the deadline.
+    # With a snapshot the workers read the tanks from shared memory instead of getting them pickled.
+    def search(self, static_map: StaticMap, problem: SearchProblem, roots: list[tuple], deadline: float,
+               snapshot: Optional[SharedSnapshot] = None) -> Optional[tuple[float, tuple]]:
+        executor = self.bind(static_map)
+        chunks = [roots[i::self.__processes] for i in range(self.__processes)]
+        worker_deadline = deadline - WORKER_DEADLINE_MARGIN
+        try:
+            if snapshot is not None:
+                shared_problem = problem._replace(tanks=())
+                futures: list[Future] = [executor.submit(_solve_shared, snapshot.name, snapshot.version,
+                                                         shared_problem, chunk, worker_deadline)
+                                         for chunk in chunks if chunk]
+            else:
+                futures = [executor.submit(_solve, problem, chunk, worker_deadline) for chunk in chunks if chunk]
+        except BrokenProcessPool:
+            self.__reset()
+            return None
+
+        done, pending = wait(futures, timeout=max(deadline - time.monotonic(), 0.0))
+        for future in pending:
+            future.cancel()
+
+        best: Optional[tuple[float, tuple]] = None
+        for future in futures:
+            if future not in done:
+                continue
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                self.__reset()
+                continue
+            except Exception as e:
+                print(f"Search worker failed: {e}")
+                continue
+            if result is None:
+                continue
+            # Ties go to the earlier chunk, so the result doesn't depend on which worker finished first
+            if best is None or result[0] > best[0]:
+                best = result
+
+        return best
+
+    def shutdown(self) -> None:
+        with self.__lock:
+            self.__shutdown()
+
+    def __reset(self) -> None:
+        with self.__lock:
+            self.__shutdown()
+
+    def __shutdown(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+        self.__executor = None
+        self.__map_key = None
+        self.__warmup = []
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock: Lock = Lock()
+
+
+# The pool of this process, None when WORKER_PROCESSES is 0
+def shared_pool() -> Optional[WorkerPool]:
+    global _pool
+    if WORKER_PROCESSES <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(WORKER_PROCESSES)
+            atexit.register(_pool.shutdown)
+        return _pool
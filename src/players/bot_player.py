@@ -1,8 +1,10 @@
 from threading import Semaphore
 from time import sleep
-from typing import Optional
+from typing import Iterable, Optional
 
+from src.constants import SEARCH_ENABLED
 from src.players.player import Player
+from src.rules import Shot
 from src.map.hex import Hex
 from src.vehicles.tank import Tank
 
@@ -11,35 +13,93 @@ class BotPlayer(Player):
     def __init__(self, name: str, password: str, is_observer: bool, turn_played_sem: Semaphore,
                  current_player: int, player_index: int, running: bool) -> None:
         super().__init__(name, password, is_observer, turn_played_sem, current_player, player_index, running)
+        self._fire_plan: dict[int, Shot] = {}
 
     def _play_turn(self) -> None:
-        if self._current_player == self.id:
-            for tank in self._tanks:
-                self._map.catapult_check(tank, tank.position)
-                self._tactic(tank)
+        if self._current_player != self.id:
+            self._client.turn()
+            return
+
+        self._budget.start()
+        validator = self._ms_logic.validator
+        validator.check_sync()
+        validator.start_turn()
+        if SEARCH_ENABLED:
+            self._play_search()
+        else:
+            self._play_tactics()
 
+        used = self._budget.elapsed
         # sleep(0.5)
-        self._client.turn()
+        timed_out = self._client.turn() == -1
+        record = self._budget.record(used, timed_out)
+        if record.overrun:
+            print(f"{self.name}: turn planning took {record.used:.3f}s of {record.deadline:.3f}s"
+                  f"{', server timed out' if timed_out else ''}")
+
+    def _play_tactics(self) -> None:
+        for tank in self._tanks:
+            self._map.catapult_check(tank, tank.position)
+
+        goals: list[tuple[Tank, Hex]] = []
+        replan = True
+        for i, tank in enumerate(self._tanks):
+            # Tanks left once the deadline has passed keep still, the actions found so far are sent
+            if self._budget.expired():
+                break
+            # Fire is allocated over the tanks still to act, the shots sent so far are already in the map
+            if replan:
+                self._fire_plan = self._ms_logic.allocate_fire(self._tanks[i:])
+            planned = tank.id in self._fire_plan
+            move_coord = self._tactic(tank)
+            if move_coord:
+                goals.append((tank, move_coord))
+            # A tank whose tactic holds its planned shot leaves the others short of the kills they were planned for
+            replan = planned and tank.id in self._fire_plan
+        self._move(goals)
+
+    def _play_search(self) -> None:
+        for tank in self._tanks:
+            self._map.catapult_check(tank, tank.position)
+
+        for action in self._ms_logic.search(self.id, self._tanks):
+            if action.kind == "shoot":
+                self._send_shoot(action.tank, action.target, action.victims)
+            else:
+                self._send_move(action.tank, action.target)
 
     # Disconnect bot_player
     def _disconnect(self) -> None:
+        print(f"{self.name}: {self._budget.summary()}")
+        if self._ms_logic is not None:
+            print(f"{self.name}: {self._ms_logic.validator.summary()}")
+        print(f"{self.name}: {self._client.stats.summary()}")
         self._client.logout()
         self._client.disconnect()
 
+    # Fires the shot the fire allocation picked for the tank, if any
     def _shoot(self, tank: Tank) -> bool:
-        coord, shoot_list = self._ms_logic.shoot(tank)
-        if not coord:
+        shot = self._fire_plan.pop(tank.id, None)
+        if shot is None:
             return False
 
-        for t in shoot_list:
+        return self._send_shoot(tank, shot.target, shot.victims)
+
+    # Illegal shots are dropped before they reach the server
+    def _send_shoot(self, tank: Tank, coord: Hex, victims: Iterable[Tank]) -> bool:
+        victims = tuple(victims)
+        if not self._ms_logic.validator.check_shot(tank, coord, victims):
+            return False
+
+        for t in victims:
             self._map.shoot_update_data(tank, t)
 
         self._client.shoot({"vehicle_id": tank.id, "target": {"x": coord.q, "y": coord.r, "z": coord.s}})
         tank.reset_bonus_range()
-
         return True
 
-    def _tactic(self, tank: Tank) -> None:
+    # Tank shoots or picks the hex it wants to move to
+    def _tactic(self, tank: Tank) -> Optional[Hex]:
 
         move_coord = self._ms_logic.move(tank.position, tank)
 
@@ -54,9 +114,23 @@ class BotPlayer(Player):
         elif tank.type == "at_spg":
             move_coord = self.tank_destroyer_tactic(tank)
 
-        if not move_coord:
+        return move_coord
+
+    # All moves are planned together, then sent in tank order so a tank may take a hex an earlier one has left
+    def _move(self, goals: list[tuple[Tank, Hex]]) -> None:
+        if not goals:
             return
 
+        targets = self._ms_logic.plan_moves(goals)
+        for tank, _ in goals:
+            if targets[tank.id] != tank.position:
+                self._send_move(tank, targets[tank.id])
+
+    # Illegal moves are dropped before they reach the server
+    def _send_move(self, tank: Tank, move_coord: Hex) -> bool:
+        if not self._ms_logic.validator.check_move(tank, move_coord):
+            return False
+
         self._map.catapult_check(tank, tank.position)
         self._map.heavy_repair_check(tank, move_coord)
         self._map.light_repair_check(tank, move_coord)
@@ -64,16 +138,20 @@ class BotPlayer(Player):
         target = {"x": move_coord.q, "y": move_coord.r, "z": move_coord.s}
         move_data = {"vehicle_id": tank.id, "target": target}
 
-        self._map.move_update_data(tank, Hex.dict_to_hex(target))
+        self._map.move_update_data(tank, move_coord)
         self._client.move(move_data)
+        return True
+
+    # Hex step places along the route; tank.path keeps the rest of the route, whether it is empty picks the
+    # tactic's branch next turn
+    @staticmethod
+    def _advance(tank: Tank, path: list[Hex], step: int) -> Hex:
+        tank.path = path[step + 1:]
+        return path[step]
 
     def has_clear_path(self, tank: Tank, h: Hex) -> bool:
-        for t in self._map.tanks.values():
-            if t.id == tank.id:
-                continue
-            if t.position == h:
-                return False
-        return True
+        t = self._map.tank_at(h)
+        return t is None or t.id == tank.id
 
     def light_tank_tactic(self, tank: Tank) -> Optional[Hex]:
         """
@@ -93,23 +171,21 @@ class BotPlayer(Player):
 
         elif (len(tank.path) == 0 and tank.bonus_range == 0) \
                 or (len(tank.path) != 0 and tank.position == tank.spawn_position):
-            catapult_list = sorted(self._map.catapult.keys(),
-                                   key=lambda hexagon: Hex.distance(tank.position, hexagon))
-            tank.path = self._ms_logic.a_star(tank.position, catapult_list[0])
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[2]):
-                tank.path.pop(0)
-                tank.path.pop(0)
-                return tank.path.pop(0)
+            catapult_list = self._ms_logic.closest(tank.position, self._map.catapult.keys())
+            # Every catapult may be cut off
+            if not catapult_list:
+                return self._ms_logic.move(tank.position, tank)
+            path = tank.path = self._ms_logic.route(tank, catapult_list[0])
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[2]):
+                return self._advance(tank, path, 2)
         elif len(tank.path) != 0 and tank.bonus_range == 0:
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[2]):
-                tank.path.pop(0)
-                tank.path.pop(0)
-                return tank.path.pop(0)
-            elif len(tank.path) >= tank.sp - 1 and self.has_clear_path(tank, tank.path[1]):
-                tank.path.pop(0)
-                return tank.path.pop(0)
-            elif len(tank.path) >= tank.sp - 2 and self.has_clear_path(tank, tank.path[0]):
-                return tank.path.pop(0)
+            path = tank.path = self._ms_logic.route(tank)
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[2]):
+                return self._advance(tank, path, 2)
+            elif len(path) >= tank.sp - 1 and self.has_clear_path(tank, path[1]):
+                return self._advance(tank, path, 1)
+            elif len(path) >= tank.sp - 2 and self.has_clear_path(tank, path[0]):
+                return self._advance(tank, path, 0)
 
         return None
 
@@ -125,23 +201,24 @@ class BotPlayer(Player):
         """
         if tank.position == tank.spawn_position:
             tank.path = []
-        if (list(self._ms_logic.can_be_shot(tank.player_id, tank.position).values())[0] - 1 < tank.hp
-            or self._ms_logic.is_in_base(tank.position)) and self._shoot(tank):
+        threat = self._ms_logic.threat_level(tank.player_id, tank.position)
+        if (threat - 1 < tank.hp or self._ms_logic.is_in_base(tank.position)) and self._shoot(tank):
             return None
-        elif list(self._ms_logic.can_be_shot(tank.player_id, tank.position).values())[0] >= tank.hp \
+        elif threat >= tank.hp \
                 and not self._ms_logic.is_in_base(tank.position) and len(tank.path) == 0 and tank.repair_needed():
-            light_list = sorted(self._map.light_repair,
-                                key=lambda hexagon: Hex.distance(tank.position, hexagon))
-            tank.path = self._ms_logic.a_star(tank.position, light_list[0])
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[1]):
-                tank.path.pop(0)
-                return tank.path.pop(0)
+            light_list = self._ms_logic.closest(tank.position, self._map.light_repair)
+            # Every repair hex may be cut off
+            if not light_list:
+                return self._ms_logic.move(tank.position, tank)
+            path = tank.path = self._ms_logic.route(tank, light_list[0])
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[1]):
+                return self._advance(tank, path, 1)
         elif len(tank.path) != 0 and tank.repair_needed():
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[1]):
-                tank.path.pop(0)
-                return tank.path.pop(0)
-            elif len(tank.path) == tank.sp - 1 and self.has_clear_path(tank, tank.path[0]):
-                return tank.path.pop(0)
+            path = tank.path = self._ms_logic.route(tank)
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[1]):
+                return self._advance(tank, path, 1)
+            elif len(path) == tank.sp - 1 and self.has_clear_path(tank, path[0]):
+                return self._advance(tank, path, 0)
         elif not tank.optimal_hex() and not self._shoot(tank):
             return self._ms_logic.move(tank.position, tank)
 
@@ -157,19 +234,22 @@ class BotPlayer(Player):
         """
         if tank.position == tank.spawn_position:
             tank.path = []
-        if (list(self._ms_logic.can_be_shot(tank.player_id, tank.position).values())[0] - 1 < tank.hp
-            or self._ms_logic.is_in_base(tank.position)) and self._shoot(tank):
+        threat = self._ms_logic.threat_level(tank.player_id, tank.position)
+        if (threat - 1 < tank.hp or self._ms_logic.is_in_base(tank.position)) and self._shoot(tank):
             return None
-        elif list(self._ms_logic.can_be_shot(tank.player_id, tank.position).values())[0] >= tank.hp \
+        elif threat >= tank.hp \
                 and not self._ms_logic.is_in_base(tank.position) and len(tank.path) == 0 and tank.repair_needed():
-            heavy_list = sorted(self._map.heavy_repair,
-                                key=lambda hexagon: Hex.distance(tank.position, hexagon))
-            tank.path = self._ms_logic.a_star(tank.position, heavy_list[0])
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[0]):
-                return tank.path.pop(0)
+            heavy_list = self._ms_logic.closest(tank.position, self._map.heavy_repair)
+            # Every repair hex may be cut off
+            if not heavy_list:
+                return self._ms_logic.move(tank.position, tank)
+            path = tank.path = self._ms_logic.route(tank, heavy_list[0])
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[0]):
+                return self._advance(tank, path, 0)
         elif len(tank.path) != 0 and tank.repair_needed():
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[0]):
-                return tank.path.pop(0)
+            path = tank.path = self._ms_logic.route(tank)
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[0]):
+                return self._advance(tank, path, 0)
         elif not tank.optimal_hex() and not self._shoot(tank):
             return self._ms_logic.move(tank.position, tank)
 
@@ -186,19 +266,21 @@ class BotPlayer(Player):
         if self._shoot(tank):
             return
         elif len(tank.path) == 0:
-            catapult_list = sorted(self._map.catapult.keys(),
-                                   key=lambda hexagon: Hex.distance(tank.position, hexagon))
-            closest_to_center = sorted(Hex.hex_ring(catapult_list[0], 3),
-                                       key=lambda hexagon: Hex.distance(Hex(0, 0, 0), hexagon))
-            for h in self._map.obstacles:
-                if h in closest_to_center:
-                    closest_to_center.remove(h)
-            tank.path = self._ms_logic.a_star(tank.position, closest_to_center[1])
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[0]):
-                return tank.path.pop(0)
+            catapult_list = self._ms_logic.closest(tank.position, self._map.catapult.keys())
+            # Every catapult may be cut off, the tank then holds its hex
+            if not catapult_list:
+                return
+            center = self._map.grid.get(0, 0, 0)
+            closest_to_center = sorted(self._map.grid.ring(catapult_list[0], 3),
+                                       key=lambda hexagon: Hex.distance(center, hexagon))
+            closest_to_center = [h for h in closest_to_center if h not in self._map.obstacle_set]
+            path = tank.path = self._ms_logic.route(tank, closest_to_center[1])
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[0]):
+                return self._advance(tank, path, 0)
         elif len(tank.path) != 0:
-            if len(tank.path) >= tank.sp and self.has_clear_path(tank, tank.path[0]):
-                return tank.path.pop(0)
+            path = tank.path = self._ms_logic.route(tank)
+            if len(path) >= tank.sp and self.has_clear_path(tank, path[0]):
+                return self._advance(tank, path, 0)
 
         return
 
@@ -213,11 +295,7 @@ class BotPlayer(Player):
         """
         if self._shoot(tank):
             return
-        td_radius = Hex.hex_ring(tank.position, 1)
-        num_of_obstacles = 0
-        for h in self._map.obstacles:
-            if h in td_radius:
-                num_of_obstacles += 1
+        num_of_obstacles = self._map.bitboards.obstacles_around(tank.position)
         for t in self._map.tanks.values():
             if t.type == "heavy_tank" and t.player_id == tank.player_id and num_of_obstacles >= 2:
                 return self._ms_logic.move(tank.position, tank)
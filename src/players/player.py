@@ -5,7 +5,10 @@ from typing import Optional
 from src.logic import MSLogic
 from src.vehicles.tank import Tank
 from src.client.game_client import ServerConnection
+from src.client.messages import PlayerInfo
+from src.client.turn_hub import TurnHub
 from src.map.game_map import Map
+from src.planning.turn_budget import TurnBudget
 from src.constants import TANK_COLORS, SPAWN_COLORS
 
 
@@ -25,8 +28,10 @@ class Player(Thread, ABC):
         self.__win_points: int = 0
 
         self._client: Optional[ServerConnection] = None
+        self._hub: Optional[TurnHub] = None
         self._map: Optional[Map] = None
         self._ms_logic: Optional[MSLogic] = None
+        self._budget: TurnBudget = TurnBudget()
         self._current_player: int = current_player
         self.__running = running
 
@@ -60,22 +65,29 @@ class Player(Thread, ABC):
     def ms_logic(self) -> MSLogic:
         return self._ms_logic
 
+    @property
+    def budget(self) -> TurnBudget:
+        return self._budget
+
     def set_win_points(self, win_points: int) -> None:
         self.__win_points = win_points
 
-    def add(self, player_info: dict, client: ServerConnection) -> None:
-        self.id = player_info["idx"]
-        self.is_observer = player_info["is_observer"]
+    # Remote players get the game's hub, they have no connection of their own
+    def add(self, player_info: PlayerInfo, client: ServerConnection, hub: Optional[TurnHub] = None) -> None:
+        self.id = player_info.idx
+        self.is_observer = player_info.is_observer
         self.__capture_points = 0
         self.__destroyed_points = 0
         self._client = client
+        self._hub = hub
 
     def add_tank(self, tank: Tank) -> None:
         self._tanks.append(tank)
 
     def round_update(self, m: Map) -> None:
-        self._map = m
-        self._ms_logic = MSLogic(self._map)
+        if self._map is not m:
+            self._map = m
+            self._ms_logic = MSLogic(self._map, self._budget)
 
     def reorder(self) -> None:
         tank_tmp = self._tanks[0]
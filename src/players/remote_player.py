@@ -1,5 +1,7 @@
 from threading import Semaphore
 
+from src.client.messages import GameAction
+from src.constants import Action
 from src.players.player import Player
 from src.map.hex import Hex
 
@@ -12,18 +14,16 @@ class RemotePlayer(Player):
     def _play_turn(self) -> None:
         if self._current_player == self.id:
             # Force the turn
-            self._client.turn()
-            # Last turn actions
-            remote_actions: list[dict] = self._client.game_actions()["actions"]
+            self._hub.turn()
+            # Last turn actions, fetched once for everyone
+            remote_actions: tuple[GameAction, ...] = self._hub.actions(self._map.grid)
 
             for action in remote_actions:
-                action_type: int = action["action_type"]
-                tank_id: int = action["data"]["vehicle_id"]
-                target_hex: Hex = Hex.dict_to_hex(action["data"]["target"])
+                target_hex: Hex = action.target
 
                 for t in self._tanks:
-                    if t.id == tank_id:
-                        if action_type == 101:
+                    if t.id == action.vehicle_id:
+                        if action.action_type == Action.MOVE:
                             self._map.move_update_data(t, target_hex)
                         else:
                             if t.type != "at_spg":
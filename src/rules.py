@@ -0,0 +1,212 @@
+from collections import Counter
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, Union
+
+from src.constants import VALIDATOR_STRICT
+from src.map.firing_table import FiringTable
+from src.map.game_map import Map
+from src.map.hex import Hex
+from src.vehicles.tank import Tank
+
+
+class Move(NamedTuple):
+    tank: Tank
+    target: Hex
+
+
+class Shot(NamedTuple):
+    tank: Tank
+    target: Hex
+    victims: tuple[Tank, ...]
+
+
+Action = Union[Move, Shot]
+
+
+# Game rules applied to the current state of a map. Actions are generated lazily; an order key makes the
+# generator sort its candidates first and accept drops candidates before anything is built for them.
+class Rules:
+    def __init__(self, game_map: Map) -> None:
+        self.__map: Map = game_map
+
+    # Neutrality rule: can't shoot a player that didn't attack us and was attacked by the third player
+    def is_neutral(self, tank: Tank, other: Tank) -> bool:
+        return self.__map.state.is_neutral(tank.player_id, other.player_id)
+
+    def can_attack(self, tank: Tank, other: Tank) -> bool:
+        return other.player_id != tank.player_id and other.hp > 0 and not self.is_neutral(tank, other)
+
+    # Bitboard of tanks the player is allowed to attack
+    def enemy_mask(self, player_id: int) -> int:
+        occupancy_bits = self.__map.occupancy_bits
+        mask = 0
+        for p in self.__map.players:
+            if p.id != player_id and not self.__map.state.is_neutral(player_id, p.id):
+                mask |= occupancy_bits.player(p.id)
+        return mask
+
+    # Hexes within sp steps around obstacles that are neither a spawn nor occupied
+    def moves(self, tank: Tank, order: Optional[Callable[[Hex], Any]] = None,
+              accept: Optional[Callable[[Hex], bool]] = None) -> Iterator[Move]:
+        targets = self.__map.reachable(tank.position, tank.sp)
+        if order is not None:
+            targets = sorted(targets, key=order)
+        for h in targets:
+            if accept is None or accept(h):
+                yield Move(tank, h)
+
+    # Shots at enemies in range, with the catapult bonus; at_spg shoot along rays and hit everyone on them
+    def shots(self, tank: Tank, order: Optional[Callable[[Shot], Any]] = None,
+              accept: Optional[Callable[[Shot], bool]] = None) -> Iterator[Shot]:
+        in_range = self.__map.bitboards.firing(tank.position, tank.type, tank.bonus_range)
+        if not in_range & self.enemy_mask(tank.player_id):
+            return
+
+        if tank.type in FiringTable.STRAIGHT_SHOOTERS:
+            shots = self.__straight_shots(tank)
+        else:
+            shots = self.__curved_shots(tank)
+        if order is not None:
+            shots = iter(sorted(shots, key=order))
+        for shot in shots:
+            if accept is None or accept(shot):
+                yield shot
+
+    # Shots first, they never move the tank
+    def actions(self, tank: Tank) -> Iterator[Action]:
+        yield from self.shots(tank)
+        yield from self.moves(tank)
+
+    # Enemies hit by a shot along the ray, own tanks are skipped and a neutral tank next to the shooter
+    # blocks the ray
+    def ray_victims(self, tank: Tank, ray: tuple[Hex, ...], neutral_blocking: bool = True) -> tuple[Tank, ...]:
+        victims = []
+        for coord in ray:
+            t = self.__map.tank_at(coord)
+            if t is None or t.player_id == tank.player_id:
+                continue
+            if self.is_neutral(tank, t):
+                if neutral_blocking and Hex.distance(coord, tank.position) == 1:
+                    break
+                continue
+            if t.hp > 0:
+                victims.append(t)
+
+        return tuple(victims)
+
+    # Ray of an at_spg shot at target, None if target is not in a straight line from the tank
+    def ray_to(self, tank: Tank, target: Hex) -> Optional[tuple[Hex, ...]]:
+        direction = Hex.direction(tank.position, target)
+        if direction is None:
+            return None
+        return self.__map.firing.rays(tank.position, tank.type, tank.bonus_range)[direction]
+
+    def __curved_shots(self, tank: Tank) -> Iterator[Shot]:
+        for coord in self.__map.firing.targets(tank.position, tank.type, tank.bonus_range):
+            t = self.__map.tank_at(coord)
+            if t is not None and self.can_attack(tank, t):
+                yield Shot(tank, coord, (t,))
+
+    def __straight_shots(self, tank: Tank) -> Iterator[Shot]:
+        rays = self.__map.firing.rays(tank.position, tank.type, tank.bonus_range)
+        for direction, ray in enumerate(rays):
+            victims = self.ray_victims(tank, ray)
+            if victims:
+                yield Shot(tank, tank.position.adjacent(direction), victims)
+
+
+# Local tanks disagree with the server, raised by a strict validator
+class DesyncError(RuntimeError):
+    pass
+
+
+# Checks actions against the rules before they are sent, so an illegal one costs neither a server round trip
+# nor a local state the server doesn't share. In strict mode a disagreement with the server is an error.
+class ActionValidator:
+    def __init__(self, game_map: Map, rules: Rules, strict: bool = VALIDATOR_STRICT) -> None:
+        self.__map: Map = game_map
+        self.__rules: Rules = rules
+        self.__strict: bool = strict
+        self.__acted: set[int] = set()
+        self.__rejections: Counter = Counter()
+        self.__desyncs: int = 0
+        self.__watcher: int = game_map.watch_mismatches()
+
+    @property
+    def strict(self) -> bool:
+        return self.__strict
+
+    # Rejected actions by reason
+    @property
+    def rejections(self) -> Counter:
+        return self.__rejections
+
+    # Turns after which local tanks disagreed with the server
+    @property
+    def desyncs(self) -> int:
+        return self.__desyncs
+
+    # Every tank acts at most once per turn
+    def start_turn(self) -> None:
+        self.__acted = set()
+
+    def check_move(self, tank: Tank, target: Hex) -> bool:
+        if tank.id in self.__acted:
+            return self.__reject("acted")
+        if target == tank.position:
+            return self.__reject("standing")
+        if target not in self.__map.reachable(tank.position, tank.sp):
+            return self.__reject("unreachable")
+
+        self.__acted.add(tank.id)
+        return True
+
+    def check_shot(self, tank: Tank, target: Hex, victims: Iterable[Tank]) -> bool:
+        victims = tuple(victims)
+        if tank.id in self.__acted:
+            return self.__reject("acted")
+        if not victims:
+            return self.__reject("no target")
+
+        if tank.type in FiringTable.STRAIGHT_SHOOTERS:
+            ray = self.__rules.ray_to(tank, target)
+            if ray is None:
+                return self.__reject("direction")
+            if target not in ray or any(t.position not in ray for t in victims):
+                return self.__reject("out of range")
+        else:
+            if target not in self.__map.firing.target_set(tank.position, tank.type, tank.bonus_range):
+                return self.__reject("out of range")
+            if any(t.position != target for t in victims):
+                return self.__reject("target")
+
+        for t in victims:
+            if t.player_id == tank.player_id:
+                return self.__reject("own tank")
+            if self.__rules.is_neutral(tank, t):
+                return self.__reject("neutral")
+
+        self.__acted.add(tank.id)
+        return True
+
+    # Local tanks have to match the server after every turn, including the turns of the other players since
+    # the last check; strict mode raises DesyncError on the first disagreement
+    def check_sync(self) -> bool:
+        mismatches = self.__map.take_mismatches(self.__watcher)
+        if not mismatches:
+            return True
+
+        turns = sorted({turn for turn, _ in mismatches})
+        self.__desyncs += len(turns)
+        if self.__strict:
+            tanks = sorted({tank_id for _, update in mismatches for tank_id in update})
+            raise DesyncError(f"Local state disagrees with the server for tanks {tanks} in turns {turns}")
+        return False
+
+    def summary(self) -> str:
+        rejected = ", ".join(f"{reason}: {count}" for reason, count in self.__rejections.most_common())
+        return f"{sum(self.__rejections.values())} actions rejected{f' ({rejected})' if rejected else ''}, " \
+               f"{self.__desyncs} turns out of sync with the server"
+
+    def __reject(self, reason: str) -> bool:
+        self.__rejections[reason] += 1
+        return False
@@ -0,0 +1,337 @@
+import random
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+from src.constants import Terrain, SEARCH_BEAM_WIDTH, SEARCH_DEPTH, SEARCH_MOVE_CANDIDATES, SEARCH_TT_SIZE
+from src.map.firing_table import FiringTable
+from src.map.hex import Hex
+from src.map.static_map import StaticMap
+from src.vehicles.tank import Tank
+
+
+class SearchAction(NamedTuple):
+    tank: Tank
+    kind: str
+    target: Hex
+    victims: tuple[Tank, ...]
+
+
+# Everything the search needs to know about a tank, hexes are grid indexes
+class TankSnapshot(NamedTuple):
+    id: int
+    player_id: int
+    type: str
+    sp: int
+    damage: int
+    full_hp: int
+    spawn: int
+    position: int
+    hp: int
+    cp: int
+    dp: int
+    bonus: int
+
+
+# Picklable description of one search: tanks by slot, the slots of the searching player in the order
+# their actions are sent, which slots may be attacked and the spawn bitboard
+class SearchProblem(NamedTuple):
+    tanks: tuple[TankSnapshot, ...]
+    own: tuple[int, ...]
+    attackable: tuple[bool, ...]
+    spawn: int
+
+
+# Compact copy of the tanks of a round: one slot per tank, hexes stored as grid indexes
+class SearchState:
+    __slots__ = ("positions", "hp", "cp", "dp", "bonus", "occupied", "key", "actions")
+
+    def __init__(self, positions: list[int], hp: list[int], cp: list[int], dp: list[int], bonus: list[int],
+                 occupied: int, key: int, actions: tuple) -> None:
+        self.positions: list[int] = positions
+        self.hp: list[int] = hp
+        self.cp: list[int] = cp
+        self.dp: list[int] = dp
+        self.bonus: list[int] = bonus
+        self.occupied: int = occupied
+        self.key: int = key
+        # Actions of the first turn that led to this state
+        self.actions: tuple = actions
+
+    def copy(self) -> "SearchState":
+        return SearchState(self.positions[:], self.hp[:], self.cp[:], self.dp[:], self.bonus[:],
+                           self.occupied, self.key, self.actions)
+
+
+# Beam search over the joint action of a player's tanks for the next few turns of that player.
+# Enemies are assumed to stand still; states are deduplicated through a Zobrist-keyed transposition table.
+# Actions are tuples (slot, "stay"), (slot, "move", hex) and (slot, "shoot", hex, victim slots).
+class BeamSearch:
+    __CAPTURE_WEIGHT = 1.0
+    __DESTRUCTION_WEIGHT = 1.0
+    __BASE_WEIGHT = 0.5
+    __BASE_DISTANCE_WEIGHT = 0.05
+    __ENEMY_CAPTURE_WEIGHT = 0.5
+    __MAX_HP = 16
+    __MAX_POINTS = 64
+    __MAX_BONUS = 4
+
+    def __init__(self, static_map: StaticMap, width: int = SEARCH_BEAM_WIDTH, depth: int = SEARCH_DEPTH,
+                 tt_size: int = SEARCH_TT_SIZE) -> None:
+        self.__static: StaticMap = static_map
+        self.__width: int = width
+        self.__depth: int = depth
+        self.__tt_size: int = tt_size
+        self.__tt: OrderedDict[int, float] = OrderedDict()
+
+        size = len(static_map.grid)
+        base = [h.index for h in static_map.hexes(Terrain.BASE)]
+        distances = static_map.paths.distances
+        if base:
+            self.__base_distance: list[int] = np.min(distances[:, base], axis=1).astype(int).tolist()
+        else:
+            self.__base_distance = [0] * size
+        self.__base: int = static_map.bitboards.base
+
+        # Keys are drawn from a private generator so the search never disturbs the game's random state
+        self.__rng: random.Random = random.Random(size)
+        self.__position_keys: list[list[int]] = []
+        self.__hp_keys: list[list[int]] = []
+        self.__points_keys: list[list[int]] = []
+        self.__bonus_keys: list[list[int]] = []
+        self.__layer_keys: list[int] = []
+        self.__player_keys: dict[int, int] = {}
+        self.__player_key: int = 0
+        # Tank and owner of every slot the table was filled for, scores mean nothing for other slots
+        self.__layout: tuple[tuple[int, int], ...] = ()
+
+        # Problem being solved
+        self.__problem: Optional[SearchProblem] = None
+
+    @property
+    def tt_size(self) -> int:
+        return len(self.__tt)
+
+    # Candidate actions of the first tank to act, a search can be split over them
+    def root_actions(self, problem: SearchProblem) -> list[tuple]:
+        self.__prepare(problem)
+        if not problem.own:
+            return []
+        slot = problem.own[0]
+        return [(slot,) + action for action in self.__candidates(self.__root(), slot)]
+
+    # Score of the best state found and the first-turn actions leading to it, the first tank only tries
+    # roots when they are given. Once expired returns True the best state of the current beam is used; the
+    # first turn is always searched, so there are actions to send even when the time is already up.
+    def solve(self, problem: SearchProblem, expired: Callable[[], bool],
+              roots: Optional[list[tuple]] = None) -> tuple[float, tuple]:
+        self.__prepare(problem)
+        root = self.__root()
+        beam: list[tuple[float, SearchState]] = [(self.__evaluate(root), root)]
+        layer = 0
+        for _ in range(self.__depth):
+            for slot in problem.own:
+                if layer >= len(problem.own) and expired():
+                    return beam[0][0], beam[0][1].actions
+                restrict = roots if layer == 0 else None
+                beam = self.__expand(beam, slot, layer, layer < len(problem.own), restrict)
+                layer += 1
+            for _, state in beam:
+                self.__capture(state)
+
+        return beam[0][0], beam[0][1].actions
+
+    def __prepare(self, problem: SearchProblem) -> None:
+        self.__problem = problem
+        size = len(self.__static.grid)
+        rng = self.__rng
+        while len(self.__position_keys) < len(problem.tanks):
+            self.__position_keys.append([rng.getrandbits(64) for _ in range(size)])
+            self.__hp_keys.append([rng.getrandbits(64) for _ in range(BeamSearch.__MAX_HP)])
+            # Capture and destruction points share one table, capture points are offset by half of it
+            self.__points_keys.append([rng.getrandbits(64) for _ in range(BeamSearch.__MAX_POINTS * 2)])
+            self.__bonus_keys.append([rng.getrandbits(64) for _ in range(BeamSearch.__MAX_BONUS)])
+        while len(self.__layer_keys) <= len(problem.own) * self.__depth:
+            self.__layer_keys.append(rng.getrandbits(64))
+
+        # States are scored for the searching player, the players of one engine keep apart in the table
+        layout = tuple((t.id, t.player_id) for t in problem.tanks)
+        if layout != self.__layout:
+            self.__tt.clear()
+            self.__layout = layout
+        if problem.own:
+            player_id = problem.tanks[problem.own[0]].player_id
+            if player_id not in self.__player_keys:
+                self.__player_keys[player_id] = rng.getrandbits(64)
+            self.__player_key = self.__player_keys[player_id]
+
+    def __root(self) -> SearchState:
+        tanks = self.__problem.tanks
+        positions = [t.position for t in tanks]
+        hp = [t.hp for t in tanks]
+        cp = [t.cp for t in tanks]
+        dp = [t.dp for t in tanks]
+        bonus = [t.bonus for t in tanks]
+        key = 0
+        occupied = 0
+        for slot in range(len(tanks)):
+            key ^= self.__position_keys[slot][positions[slot]] ^ self.__hp_key(slot, hp[slot]) \
+                   ^ self.__dp_key(slot, dp[slot]) ^ self.__cp_key(slot, cp[slot]) ^ self.__bonus_key(slot, bonus[slot])
+            occupied |= 1 << positions[slot]
+        return SearchState(positions, hp, cp, dp, bonus, occupied, key, ())
+
+    def __hp_key(self, slot: int, hp: int) -> int:
+        return self.__hp_keys[slot][min(max(hp, 0), BeamSearch.__MAX_HP - 1)]
+
+    def __dp_key(self, slot: int, dp: int) -> int:
+        return self.__points_keys[slot][min(dp, BeamSearch.__MAX_POINTS - 1)]
+
+    def __cp_key(self, slot: int, cp: int) -> int:
+        return self.__points_keys[slot][BeamSearch.__MAX_POINTS + min(cp, BeamSearch.__MAX_POINTS - 1)]
+
+    # Catapult range changes what a tank can hit, states that differ only in it are different states
+    def __bonus_key(self, slot: int, bonus: int) -> int:
+        return self.__bonus_keys[slot][min(max(bonus, 0), BeamSearch.__MAX_BONUS - 1)]
+
+    # Every state of the beam tries every candidate action of one tank, the best distinct children survive
+    def __expand(self, beam: list[tuple[float, SearchState]], slot: int, layer: int, first_turn: bool,
+                 restrict: Optional[list[tuple]]) -> list[tuple[float, SearchState]]:
+        children: list[tuple[float, int, SearchState]] = []
+        seen: set[int] = set()
+        layer_key = self.__layer_keys[layer] ^ self.__player_key
+        order = 0
+
+        for _, state in beam:
+            if restrict is not None:
+                candidates = [action[1:] for action in restrict]
+            else:
+                candidates = self.__candidates(state, slot)
+            for action in candidates:
+                child = state.copy()
+                self.__apply(child, slot, action)
+                if first_turn:
+                    child.actions = state.actions + ((slot,) + action,)
+
+                key = child.key ^ layer_key
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                children.append((-self.__score(key, child), order, child))
+                order += 1
+
+        if not children:
+            return beam
+        children.sort(key=lambda c: (c[0], c[1]))
+        return [(-score, child) for score, _, child in children[:self.__width]]
+
+    # ("stay",), ("move", hex) or ("shoot", hex, victims); moves are limited to the ones closest to the base
+    def __candidates(self, state: SearchState, slot: int) -> list[tuple]:
+        tank = self.__problem.tanks[slot]
+        position = state.positions[slot]
+        candidates: list[tuple] = [("stay",)]
+        candidates += self.__shots(state, slot, tank, position)
+
+        blocked = state.occupied | self.__problem.spawn
+        moves = [h for h in self.__static.paths.within(position, tank.sp) if not blocked >> h & 1]
+        moves.sort(key=lambda h: (self.__base_distance[h], h))
+        candidates += [("move", h) for h in moves[:SEARCH_MOVE_CANDIDATES]]
+        return candidates
+
+    def __shots(self, state: SearchState, slot: int, tank: TankSnapshot, position: int) -> list[tuple]:
+        grid = self.__static.grid
+        firing = self.__static.firing
+        h = grid.by_index(position)
+        bonus = state.bonus[slot]
+        targets = []
+
+        if tank.type in FiringTable.STRAIGHT_SHOOTERS:
+            for direction, ray in enumerate(firing.rays(h, tank.type, bonus)):
+                victims = tuple(victim for cell in ray for victim in self.__enemies_at(state, cell.index))
+                if victims:
+                    targets.append(("shoot", h.adjacent(direction).index, victims))
+        else:
+            in_range = self.__static.bitboards.firing(h, tank.type, bonus)
+            attackable = self.__problem.attackable
+            for victim in range(len(attackable)):
+                if attackable[victim] and state.hp[victim] > 0 and in_range >> state.positions[victim] & 1:
+                    targets.append(("shoot", state.positions[victim], (victim,)))
+
+        return targets
+
+    def __enemies_at(self, state: SearchState, cell: int) -> list[int]:
+        if not state.occupied >> cell & 1:
+            return []
+        return [victim for victim, position in enumerate(state.positions)
+                if position == cell and self.__problem.attackable[victim] and state.hp[victim] > 0]
+
+    def __apply(self, state: SearchState, slot: int, action: tuple) -> None:
+        if action[0] == "move":
+            self.__place(state, slot, action[1])
+        elif action[0] == "shoot":
+            for victim in action[2]:
+                self.__hit(state, slot, victim)
+            state.key ^= self.__bonus_key(slot, state.bonus[slot]) ^ self.__bonus_key(slot, 0)
+            state.bonus[slot] = 0
+
+    def __place(self, state: SearchState, slot: int, cell: int) -> None:
+        old = state.positions[slot]
+        keys = self.__position_keys[slot]
+        state.key ^= keys[old] ^ keys[cell]
+        state.occupied = (state.occupied & ~(1 << old)) | (1 << cell)
+        state.positions[slot] = cell
+
+    def __hit(self, state: SearchState, slot: int, victim: int) -> None:
+        tank = self.__problem.tanks[victim]
+        state.key ^= self.__hp_key(victim, state.hp[victim])
+        state.hp[victim] -= self.__problem.tanks[slot].damage
+        if state.hp[victim] <= 0:
+            state.key ^= self.__dp_key(slot, state.dp[slot])
+            state.dp[slot] += tank.full_hp
+            state.key ^= self.__dp_key(slot, state.dp[slot])
+            state.hp[victim] = tank.full_hp
+            state.key ^= self.__cp_key(victim, state.cp[victim]) ^ self.__cp_key(victim, 0)
+            state.cp[victim] = 0
+            self.__place(state, victim, tank.spawn)
+        state.key ^= self.__hp_key(victim, state.hp[victim])
+
+    # Own tanks standing on the base earn a capture point at the end of the turn
+    def __capture(self, state: SearchState) -> None:
+        for slot in self.__problem.own:
+            if self.__base >> state.positions[slot] & 1:
+                state.key ^= self.__cp_key(slot, state.cp[slot]) ^ self.__cp_key(slot, state.cp[slot] + 1)
+                state.cp[slot] += 1
+
+    def __score(self, key: int, state: SearchState) -> float:
+        tt = self.__tt
+        score = tt.get(key)
+        if score is not None:
+            tt.move_to_end(key)
+            return score
+
+        score = self.__evaluate(state)
+        tt[key] = score
+        if len(tt) > self.__tt_size:
+            tt.popitem(last=False)
+        return score
+
+    # Capture and destruction points of the player against the best capturing enemy
+    def __evaluate(self, state: SearchState) -> float:
+        base = self.__base
+        own_cp = own_dp = on_base = base_distance = 0
+        enemy_cp: dict[int, int] = {}
+        own = self.__problem.tanks[self.__problem.own[0]].player_id if self.__problem.own else None
+        for slot, tank in enumerate(self.__problem.tanks):
+            position = state.positions[slot]
+            if tank.player_id == own:
+                own_cp += state.cp[slot]
+                own_dp += state.dp[slot]
+                on_base += base >> position & 1
+                base_distance += self.__base_distance[position]
+            else:
+                enemy_cp[tank.player_id] = enemy_cp.get(tank.player_id, 0) + state.cp[slot]
+
+        return BeamSearch.__CAPTURE_WEIGHT * own_cp + BeamSearch.__DESTRUCTION_WEIGHT * own_dp \
+            + BeamSearch.__BASE_WEIGHT * on_base - BeamSearch.__BASE_DISTANCE_WEIGHT * base_distance \
+            - BeamSearch.__ENEMY_CAPTURE_WEIGHT * max(enemy_cp.values(), default=0)
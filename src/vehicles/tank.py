@@ -1,14 +1,16 @@
+from src.client.messages import VehicleState
 from src.map.hex import Hex
-from src.constants import tank_characteristics, OPTIMAL_HEXES
+from src.constants import tank_characteristics, OPTIMAL_HEXES, CATAPULT_BONUS_RANGE
 
 
 class Tank:
-    def __init__(self, tank_id: int, tank_data: dict, tank_color: tuple, spawn_color: tuple) -> None:
+    def __init__(self, tank_id: int, tank_data: VehicleState, spawn_position: Hex, tank_color: tuple,
+                 spawn_color: tuple) -> None:
         self.__tank_id: int = tank_id
-        self.__player_id: int = tank_data["player_id"]
-        self.__tank_type: str = tank_data["vehicle_type"]
+        self.__player_id: int = tank_data.player_id
+        self.__tank_type: str = tank_data.vehicle_type
 
-        self.__hp: int = tank_data["health"]
+        self.__hp: int = tank_data.health
         self.__full_hp: int = self.__hp
         self.__sp: int = tank_characteristics[self.__tank_type]["sp"]
 
@@ -17,10 +19,10 @@ class Tank:
         self.__bonus_range: int = 0
         self.__damage: int = 1
 
-        self.__capture_points: int = tank_data["capture_points"]
+        self.__capture_points: int = tank_data.capture_points
         self.__destruction_points: int = 0
 
-        self.__spawn_position: Hex = Hex.dict_to_hex(tank_data["spawn_position"])
+        self.__spawn_position: Hex = spawn_position
         self.__position: Hex = self.__spawn_position
         self.path: list = []
 
@@ -105,7 +107,7 @@ class Tank:
         self.__destruction_points = new_dp
 
     def update_bonus_range(self) -> None:
-        self.__bonus_range = 1
+        self.__bonus_range = CATAPULT_BONUS_RANGE
 
     def reset_bonus_range(self) -> None:
         self.__bonus_range = 0
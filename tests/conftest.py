@@ -0,0 +1,84 @@
+import os
+from types import MappingProxyType
+from typing import Iterable, Optional
+
+import pytest
+
+# Maps build a renderer, which needs a display; tests never show one
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from src.client.messages import GameState, MapInfo, PlayerInfo, VehicleState
+from src.map.hex import Hex
+from src.map.static_map import StaticMap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FULL_HP = {"spg": 1, "light_tank": 1, "heavy_tank": 3, "medium_tank": 2, "at_spg": 2}
+
+
+# Small maps and states built by hand, hexes are given as (q, r, s) tuples
+def map_info(size: int = 6, base: Iterable[tuple] = ((0, 0, 0),), obstacles: Iterable[tuple] = (),
+             catapults: Iterable[tuple] = (), light_repairs: Iterable[tuple] = (),
+             heavy_repairs: Iterable[tuple] = ()) -> MapInfo:
+    return MapInfo(size, "test", {"base": tuple(base), "obstacle": tuple(obstacles), "catapult": tuple(catapults),
+                                  "light_repair": tuple(light_repairs), "hard_repair": tuple(heavy_repairs)})
+
+
+def vehicle(tank_id: int, player_id: int, vehicle_type: str, position: tuple, spawn: Optional[tuple] = None,
+            health: Optional[int] = None, capture_points: int = 0) -> VehicleState:
+    return VehicleState(tank_id, player_id, vehicle_type, FULL_HP[vehicle_type] if health is None else health,
+                        Hex(t=spawn or position), Hex(t=position), capture_points)
+
+
+def game_state(vehicles: Iterable[VehicleState], current_turn: int = 1, current_player: int = 1,
+               player_ids: Iterable[int] = (1, 2, 3)) -> GameState:
+    player_ids = tuple(player_ids)
+    return GameState(len(player_ids), 45, 1, current_turn, 1, current_player, False,
+                     tuple(PlayerInfo(idx, f"p{idx}", False) for idx in player_ids), (), tuple(vehicles), None,
+                     MappingProxyType({idx: 0 for idx in player_ids}))
+
+
+# What DynamicState and Map need from a player
+class PlayerStub:
+    def __init__(self, player_id: int) -> None:
+        self.id: int = player_id
+        self.name: str = f"p{player_id}"
+        self.is_observer: bool = False
+        self.tank_color: tuple = (0, 0, 0)
+        self.spawn_color: tuple = (0, 0, 0)
+        self.tanks: list = []
+
+    def add_tank(self, tank) -> None:
+        self.tanks.append(tank)
+
+    def reorder(self) -> None:
+        pass
+
+
+def players(player_ids: Iterable[int] = (1, 2, 3)) -> dict[int, PlayerStub]:
+    return {idx: PlayerStub(idx) for idx in player_ids}
+
+
+def static_map(info: Optional[MapInfo] = None) -> StaticMap:
+    return StaticMap(info or map_info())
+
+
+# Path tables are cached per test, never in the working tree
+@pytest.fixture(autouse=True)
+def path_cache(tmp_path, monkeypatch) -> str:
+    cache_dir = str(tmp_path / "path_tables")
+    monkeypatch.setattr("src.map.path_table.PATH_TABLE_CACHE_DIR", cache_dir)
+    return cache_dir
+
+
+# Renderer assets are loaded relative to the repository root
+@pytest.fixture
+def display(monkeypatch):
+    import pygame
+
+    monkeypatch.chdir(ROOT)
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.quit()
@@ -0,0 +1,96 @@
+from conftest import game_state, map_info, players, static_map, vehicle
+from src.map.bitboards import Bitboards, DynamicBitboards
+from src.map.dynamic_state import DynamicState
+
+
+def make_state():
+    terrain = static_map(map_info(obstacles=((2, -2, 0),)))
+    state = DynamicState(terrain, game_state([vehicle(1, 1, "medium_tank", (-3, 3, 0)),
+                                              vehicle(2, 1, "light_tank", (-3, 2, 1)),
+                                              vehicle(3, 2, "heavy_tank", (3, -3, 0))]), players())
+    return terrain, state
+
+
+def test_masks_round_trip_hexes():
+    grid = static_map().grid
+    hexes = [grid.get(0, 0, 0), grid.get(1, -1, 0), grid.get(-2, 2, 0)]
+
+    mask = Bitboards.from_hexes(hexes)
+
+    assert Bitboards.popcount(mask) == 3
+    assert sorted(Bitboards.to_hexes(grid, mask), key=lambda h: h.index) == sorted(hexes, key=lambda h: h.index)
+    assert Bitboards.to_array(mask, len(grid)).sum() == 3
+
+
+def test_static_masks_match_terrain():
+    terrain = static_map(map_info(obstacles=((2, -2, 0),)))
+    obstacle = terrain.grid.get(2, -2, 0)
+
+    assert terrain.bitboards.obstacles == Bitboards.bit(obstacle)
+    assert terrain.bitboards.base == Bitboards.bit(terrain.grid.get(0, 0, 0))
+    assert not terrain.bitboards.passable & Bitboards.bit(obstacle)
+    assert terrain.bitboards.obstacles_around(terrain.grid.get(1, -1, 0)) == 1
+
+
+def test_expand_matches_reachable_hexes():
+    terrain = static_map(map_info(obstacles=((1, -1, 0), (1, 0, -1), (0, 1, -1))))
+    center = terrain.grid.get(0, 0, 0)
+
+    reached = terrain.bitboards.expand(Bitboards.bit(center), 2)
+
+    expected = {center} | {terrain.grid.by_index(i) for i in terrain.paths.within(center.index, 2)}
+    assert set(Bitboards.to_hexes(terrain.grid, reached)) == expected
+
+
+def test_placing_tanks_sets_player_masks():
+    terrain, state = make_state()
+    bitboards = state.bitboards
+    tanks = state.tanks
+
+    assert bitboards.player(1) == Bitboards.from_hexes([tanks[1].position, tanks[2].position])
+    assert bitboards.player(2) == Bitboards.bit(tanks[3].position)
+    assert bitboards.occupied == bitboards.player(1) | bitboards.player(2)
+    assert bitboards.spawn == bitboards.occupied
+
+
+def test_move_updates_old_and_new_hex():
+    terrain, state = make_state()
+    tank = state.tanks[1]
+    old, new = tank.position, terrain.grid.get(-2, 2, 0)
+
+    state.place(tank, new)
+
+    assert not state.bitboards.occupied & Bitboards.bit(old)
+    assert state.bitboards.player(1) & Bitboards.bit(new)
+    assert state.tank_at(new) is tank and state.tank_at(old) is None
+
+
+def test_tank_leaving_a_hex_another_tank_took_first():
+    terrain, state = make_state()
+    mover, other = state.tanks[1], state.tanks[3]
+    shared = mover.position
+    away = terrain.grid.get(-1, 1, 0)
+
+    # The other player's tank is placed on the hex before the mover leaves it
+    state.place(other, shared)
+    state.place(mover, away)
+    assert not state.bitboards.player(1) & Bitboards.bit(shared)
+    assert state.bitboards.player(2) & Bitboards.bit(shared)
+    assert state.bitboards.occupied & Bitboards.bit(shared)
+
+    state.place(other, terrain.grid.get(1, -1, 0))
+    assert not state.bitboards.player(2) & Bitboards.bit(shared)
+    assert not state.bitboards.occupied & Bitboards.bit(shared)
+    assert state.tank_at(shared) is None
+
+
+def test_occupant_keeps_its_bit_on_a_shared_hex():
+    grid = static_map().grid
+    h, other = grid.get(1, 0, -1), grid.get(2, 0, -2)
+    bitboards = DynamicBitboards([1, 2])
+    bitboards.move(1, None, h)
+
+    bitboards.move(1, h, other, occupant=1)
+
+    assert bitboards.player(1) == Bitboards.from_hexes([h, other])
+    assert bitboards.occupied == Bitboards.from_hexes([h, other])
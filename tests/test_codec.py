@@ -0,0 +1,92 @@
+import pytest
+
+from conftest import static_map
+from src.client.codec import JsonCodec, msgspec, orjson
+from src.client.messages import decode_game_actions, decode_game_state, decode_map
+from src.constants import Action
+from src.map.hex import Hex
+
+BACKENDS = ["json"] + ["orjson"] * (orjson is not None) + ["msgspec"] * (msgspec is not None)
+
+STATE = {
+    "num_players": 2, "num_turns": 45, "num_rounds": 1, "current_turn": 3, "current_round": 1,
+    "current_player_idx": 7, "finished": False,
+    "players": [{"idx": 7, "name": "bot", "is_observer": False}, {"idx": 8, "name": "other"}],
+    "observers": [],
+    "vehicles": {"1": {"player_id": 7, "vehicle_type": "medium_tank", "health": 2,
+                       "spawn_position": {"x": -3, "y": 3, "z": 0}, "position": {"x": -2, "y": 2, "z": 0},
+                       "capture_points": 1}},
+    "winner": None,
+    "player_result_points": {"7": 4, "8": 0},
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_round_trip_messages(backend):
+    codec = JsonCodec(backend)
+
+    data = codec.dumps(STATE)
+
+    assert codec.backend == backend
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == STATE
+    assert codec.loads(memoryview(data)) == STATE
+    assert codec.copies_input == (backend == "json")
+
+
+def test_unknown_backend_is_an_error():
+    with pytest.raises(ValueError):
+        JsonCodec("yaml")
+
+
+def test_game_state_is_typed():
+    state = decode_game_state(STATE)
+
+    assert (state.current_turn, state.current_player_idx, state.winner) == (3, 7, None)
+    assert [p.name for p in state.players] == ["bot", "other"]
+    assert not state.players[1].is_observer
+    vehicle = state.vehicles[0]
+    assert (vehicle.id, vehicle.player_id, vehicle.health, vehicle.capture_points) == (1, 7, 2, 1)
+    assert vehicle.position == Hex(-2, 2, 0) and vehicle.spawn_position == Hex(-3, 3, 0)
+    assert dict(state.player_result_points) == {7: 4, 8: 0}
+
+
+def test_hexes_are_interned_in_the_grid():
+    grid = static_map().grid
+
+    state = decode_game_state(STATE, grid)
+
+    assert state.vehicles[0].position is grid.get(-2, 2, 0)
+    assert state.vehicles[0].spawn_position is grid.get(-3, 3, 0)
+
+
+def test_result_points_are_read_only():
+    state = decode_game_state(STATE)
+
+    with pytest.raises(TypeError):
+        state.player_result_points[7] = 100
+    with pytest.raises(AttributeError):
+        state.current_turn = 4
+
+
+def test_actions_keep_only_moves_and_shots():
+    data = {"actions": [{"action_type": Action.MOVE, "player_id": 7,
+                         "data": {"vehicle_id": 1, "target": {"x": -1, "y": 1, "z": 0}}},
+                        {"action_type": Action.CHAT, "player_id": 8, "data": {"message": "hi"}},
+                        {"action_type": Action.SHOOT, "player_id": 8,
+                         "data": {"vehicle_id": 5, "target": {"x": -2, "y": 2, "z": 0}}}]}
+    grid = static_map().grid
+
+    actions = decode_game_actions(data, grid)
+
+    assert [(a.action_type, a.player_id, a.vehicle_id) for a in actions] == [(Action.MOVE, 7, 1),
+                                                                           (Action.SHOOT, 8, 5)]
+    assert actions[0].target is grid.get(-1, 1, 0)
+
+
+def test_map_content_is_kept_as_coordinates():
+    info = decode_map({"size": 11, "name": "map", "content": {"base": [{"x": 0, "y": 0, "z": 0}],
+                                                              "obstacle": []}})
+
+    assert (info.size, info.name) == (11, "map")
+    assert info.content == {"base": ((0, 0, 0),), "obstacle": ()}
@@ -0,0 +1,109 @@
+import json
+import socketserver
+import struct
+import threading
+
+import pytest
+
+from src.client.connection_pool import ConnectionPool
+from src.client.protocol import ConnectionLost
+from src.constants import Action, Result
+
+
+# Answers logins and logouts like the game server; "refused" gets an error result, "dropped" a closed connection
+class ServerStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), ServerStub.Handler)
+        self.connections: int = 0
+        self.logins: int = 0
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            self.server.connections += 1
+            stream = self.request.makefile("rb")
+            while header := stream.read(8):
+                action, length = struct.unpack("<II", header)
+                body = json.loads(stream.read(length)) if length else None
+                code, data = Result.OKEY, {}
+                if action == Action.LOGIN:
+                    self.server.logins += 1
+                    if body["name"] == "dropped":
+                        return
+                    if body["name"] == "refused":
+                        code, data = Result.BAD_COMMAND, {"error_message": "refused"}
+                    else:
+                        data = {"idx": self.server.logins, "name": body["name"]}
+                payload = json.dumps(data).encode()
+                self.request.sendall(struct.pack("<II", code, len(payload)) + payload)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = ServerStub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr("src.client.game_client.SERVER_HOST", "127.0.0.1")
+    monkeypatch.setattr("src.client.game_client.SERVER_PORT", server.server_address[1])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool()
+    yield pool
+    pool.close()
+
+
+# One game: the info connection and three players logged in together, all logged out at the end
+def play_game(pool):
+    connections = [pool.login(f"player{i}")[0] for i in range(4)]
+    for connection in connections:
+        connection.logout()
+        connection.disconnect()
+
+
+def test_consecutive_games_reuse_connections(server, pool):
+    for _ in range(3):
+        play_game(pool)
+
+    assert (pool.stats.connects, pool.stats.reuses, pool.stats.logins) == (4, 8, 12)
+    assert server.connections == 4
+    assert pool.idle == 4
+
+
+def test_refused_login_is_not_retried(server, pool):
+    play_game(pool)
+
+    with pytest.raises(ConnectionError) as error:
+        pool.login("refused")
+
+    assert not isinstance(error.value, ConnectionLost)
+    assert server.logins == 5
+    assert server.connections == 4
+    # The connection is fine, it goes back to the pool
+    assert pool.idle == 4
+
+
+def test_dropped_login_is_retried_once_on_a_new_connection(server, pool):
+    play_game(pool)
+
+    with pytest.raises(ConnectionLost):
+        pool.login("dropped")
+
+    assert server.logins == 6
+    assert server.connections == 5
+    assert pool.idle == 3
+
+
+def test_idle_connections_past_the_timeout_are_closed(server):
+    pool = ConnectionPool(idle_timeout=-1)
+    play_game(pool)
+
+    pool.login("late")[0].close()
+
+    assert (pool.stats.connects, pool.stats.reuses) == (5, 0)
+    assert pool.idle == 0
@@ -0,0 +1,74 @@
+from conftest import game_state, players, static_map, vehicle
+from src.map.dynamic_state import DynamicState
+from src.planning.cooperative_planner import CooperativePlanner
+
+
+def make_state(terrain, vehicles):
+    return DynamicState(terrain, game_state(vehicles), players())
+
+
+def test_tanks_with_one_goal_get_different_targets():
+    terrain = static_map()
+    state = make_state(terrain, [vehicle(1, 1, "medium_tank", (-2, 1, 1)),
+                                 vehicle(2, 1, "medium_tank", (-1, 2, -1)),
+                                 vehicle(3, 1, "heavy_tank", (2, 0, -2))])
+    goal = terrain.grid.get(0, 0, 0)
+    tanks = state.tanks
+
+    targets = CooperativePlanner(terrain).plan(state, [(tanks[i], goal) for i in (1, 2, 3)])
+
+    assert len(set(targets.values())) == 3
+    assert goal in targets.values()
+    for idx, target in targets.items():
+        assert terrain.paths.distance(tanks[idx].position, target) <= tanks[idx].sp
+
+
+def test_targets_avoid_tanks_that_do_not_move():
+    terrain = static_map()
+    state = make_state(terrain, [vehicle(1, 1, "light_tank", (-3, 0, 3)),
+                                 vehicle(2, 2, "heavy_tank", (-2, 0, 2)),
+                                 vehicle(3, 2, "heavy_tank", (-1, 0, 1))])
+    tank = state.tanks[1]
+    goal = terrain.grid.get(0, 0, 0)
+
+    # The straight line to the goal is taken, the tank goes around in two turns
+    target = CooperativePlanner(terrain).plan(state, [(tank, goal)])[1]
+
+    assert target != tank.position
+    assert not state.is_occupied(target)
+    assert terrain.paths.distance(tank.position, target) <= tank.sp
+    assert terrain.paths.distance(target, goal) <= tank.sp
+
+
+def test_tanks_do_not_swap_through_each_other():
+    terrain = static_map()
+    state = make_state(terrain, [vehicle(1, 1, "heavy_tank", (0, 1, -1)),
+                                 vehicle(2, 1, "heavy_tank", (0, 2, -2))])
+    tanks = state.tanks
+    a, b = tanks[1].position, tanks[2].position
+
+    # Each tank wants the other's hex, the first one planned can't move in before the second leaves
+    targets = CooperativePlanner(terrain).plan(state, [(tanks[1], b), (tanks[2], a)])
+
+    assert targets[1] != b
+    assert targets[1] != targets[2]
+
+
+def test_tank_on_its_goal_stays():
+    terrain = static_map()
+    state = make_state(terrain, [vehicle(1, 1, "medium_tank", (0, 0, 0))])
+    tank = state.tanks[1]
+
+    assert CooperativePlanner(terrain).plan(state, [(tank, tank.position)]) == {1: tank.position}
+
+
+def test_out_of_budget_tanks_stay():
+    terrain = static_map()
+    state = make_state(terrain, [vehicle(1, 1, "medium_tank", (-3, 3, 0)),
+                                 vehicle(2, 1, "medium_tank", (3, -3, 0))])
+    tanks = state.tanks
+    goal = terrain.grid.get(0, 0, 0)
+
+    targets = CooperativePlanner(terrain).plan(state, [(tanks[1], goal), (tanks[2], goal)], budget=-1)
+
+    assert targets == {1: tanks[1].position, 2: tanks[2].position}
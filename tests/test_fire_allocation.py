@@ -0,0 +1,68 @@
+from conftest import vehicle
+from src.planning.fire_allocation import FireAllocator
+from src.rules import Shot
+from src.vehicles.tank import Tank
+
+
+def tank(tank_id, player_id, vehicle_type, position, health=None, capture_points=0):
+    data = vehicle(tank_id, player_id, vehicle_type, position, health=health, capture_points=capture_points)
+    return Tank(tank_id, data, data.spawn_position, (0, 0, 0), (0, 0, 0))
+
+
+def shots_at(shooter, *targets):
+    return [Shot(shooter, t.position, (t,)) for t in targets]
+
+
+def test_shooters_focus_a_target_they_can_finish_together():
+    a, b = tank(1, 1, "medium_tank", (0, 0, 0)), tank(2, 1, "medium_tank", (1, 0, -1))
+    medium = tank(3, 2, "medium_tank", (2, -2, 0), capture_points=1)
+    light = tank(4, 2, "light_tank", (-2, 2, 0))
+
+    plan = FireAllocator().allocate({a: shots_at(a, medium, light), b: shots_at(b, medium)})
+
+    assert {shot.target for shot in plan.values()} == {medium.position}
+    assert set(plan) == {1, 2}
+
+
+def test_no_shot_is_wasted_on_a_finished_target():
+    a, b = tank(1, 1, "medium_tank", (0, 0, 0)), tank(2, 1, "medium_tank", (1, 0, -1))
+    damaged = tank(3, 2, "medium_tank", (2, -2, 0), health=1)
+    heavy = tank(4, 2, "heavy_tank", (-2, 2, 0))
+
+    plan = FireAllocator().allocate({a: shots_at(a, damaged, heavy), b: shots_at(b, damaged)})
+
+    assert plan[2].target == damaged.position
+    assert plan[1].target == heavy.position
+
+
+def test_shooters_without_a_useful_shot_hold_fire():
+    a, b = tank(1, 1, "medium_tank", (0, 0, 0)), tank(2, 1, "medium_tank", (1, 0, -1))
+    c = tank(3, 1, "spg", (-1, 0, 1))
+    light = tank(4, 2, "light_tank", (2, -2, 0))
+
+    plan = FireAllocator().allocate({a: shots_at(a, light), b: shots_at(b, light), c: []})
+
+    assert len(plan) == 1
+    assert next(iter(plan.values())).victims == (light,)
+
+
+def test_one_shot_hitting_several_tanks_is_preferred():
+    at_spg, medium = tank(1, 1, "at_spg", (0, 0, 0)), tank(2, 1, "medium_tank", (0, 2, -2))
+    first, second = tank(3, 2, "light_tank", (1, -1, 0)), tank(4, 2, "light_tank", (2, -2, 0))
+    ray = Shot(at_spg, first.position, (first, second))
+
+    plan = FireAllocator().allocate({at_spg: [ray] + shots_at(at_spg, first), medium: shots_at(medium, second)})
+
+    # The ray kills both, so the medium tank has nothing left to hit
+    assert plan == {1: ray}
+
+
+def test_interrupted_search_keeps_the_greedy_plan():
+    a, b = tank(1, 1, "medium_tank", (0, 0, 0)), tank(2, 1, "medium_tank", (1, 0, -1))
+    light = tank(3, 2, "light_tank", (2, -2, 0))
+    heavy = tank(4, 2, "heavy_tank", (-2, 2, 0))
+
+    plan = FireAllocator(max_nodes=1).allocate({a: shots_at(a, light, heavy), b: shots_at(b, light, heavy)})
+
+    assert len(plan) == 2
+    assert {shot.target for shot in plan.values()} == {light.position, heavy.position}
@@ -0,0 +1,66 @@
+import os
+
+from conftest import map_info, static_map
+from src.map.hex import Hex
+from src.map.path_table import PathTable
+
+
+def test_distances_walk_around_obstacles():
+    # A wall between (0, 0, 0) and (2, -2, 0) leaves only the way around it
+    wall = ((1, -1, 0), (1, 0, -1), (0, -1, 1), (2, -1, -1), (1, -2, 1))
+    walled = static_map(map_info(obstacles=wall))
+    paths = walled.paths
+    start, finish = walled.grid.get(0, 0, 0), walled.grid.get(2, -2, 0)
+
+    path = paths.path(start, finish)
+
+    assert Hex.distance(start, finish) == 2
+    assert paths.distance(start, finish) == len(path) > 2
+    assert path[-1] is finish
+    assert not any(h.q == 1 and h.r in (-1, 0) for h in path)
+    steps = [start] + path
+    assert all(Hex.distance(a, b) == 1 for a, b in zip(steps, steps[1:]))
+
+
+def test_enclosed_hex_is_unreachable():
+    ring = tuple((h.q, h.r, h.s) for h in Hex.hex_ring(Hex(3, -3, 0), 1))
+    grid_map = static_map(map_info(obstacles=ring))
+    start, finish = grid_map.grid.get(0, 0, 0), grid_map.grid.get(3, -3, 0)
+
+    assert not grid_map.paths.is_reachable(start, finish)
+    assert grid_map.paths.path(start, finish) is None
+    assert grid_map.paths.closest(start, [finish]) == []
+
+
+def test_cached_table_is_loaded(path_cache):
+    built = static_map()
+    files = os.listdir(path_cache)
+    assert len(files) == 1 and files[0].endswith(".npz")
+
+    loaded = static_map()
+    assert (loaded.paths.distances == built.paths.distances).all()
+    assert (loaded.paths.next_hops == built.paths.next_hops).all()
+
+
+def test_truncated_cache_is_rebuilt(path_cache):
+    built = static_map()
+    cache_file = os.path.join(path_cache, os.listdir(path_cache)[0])
+    with open(cache_file, "rb") as file:
+        data = file.read()
+    with open(cache_file, "wb") as file:
+        file.write(data[:len(data) // 2])
+
+    rebuilt = static_map()
+
+    assert (rebuilt.paths.distances == built.paths.distances).all()
+    assert os.listdir(path_cache) == [os.path.basename(cache_file)]
+    assert os.path.getsize(cache_file) == len(data)
+
+
+def test_cache_of_another_size_is_ignored(path_cache):
+    small = static_map(map_info(size=4))
+    key = PathTable.payload_key(map_info(size=4)._asdict())
+
+    table = PathTable(static_map(map_info(size=5)).grid, frozenset(), key)
+
+    assert table.distances.shape != small.paths.distances.shape
@@ -0,0 +1,84 @@
+from conftest import game_state, map_info, players, static_map, vehicle
+from src.map.dynamic_state import DynamicState
+from src.map.hex import Hex
+from src.planning.route_planner import RoutePlanner
+
+START = (-3, 3, 0)
+GOAL = (3, -3, 0)
+
+
+def make_state(terrain, blockers=()):
+    vehicles = [vehicle(1, 1, "medium_tank", START)]
+    vehicles += [vehicle(10 + i, 2, "heavy_tank", h) for i, h in enumerate(blockers)]
+    return DynamicState(terrain, game_state(vehicles), players())
+
+
+def assert_walkable(start, path, state):
+    steps = [start] + path
+    assert all(Hex.distance(a, b) == 1 for a, b in zip(steps, steps[1:]))
+    assert not any(state.is_occupied(h) for h in path)
+
+
+def test_free_route_is_a_shortest_path():
+    terrain = static_map()
+    state = make_state(terrain)
+    start, goal = terrain.grid.get(*START), terrain.grid.get(*GOAL)
+
+    path = RoutePlanner(terrain, goal).plan(state, start)
+
+    assert len(path) == terrain.paths.distance(start, goal)
+    assert path[-1] is goal
+    assert_walkable(start, path, state)
+
+
+def test_route_is_repaired_around_a_tank_and_back():
+    terrain = static_map()
+    state = make_state(terrain, blockers=[(0, 0, 0)])
+    start, goal = terrain.grid.get(*START), terrain.grid.get(*GOAL)
+    planner = RoutePlanner(terrain, goal)
+    blocker = state.tank_at(terrain.grid.get(0, 0, 0))
+
+    # The straight line runs through the centre, where the other tank stands
+    path = planner.plan(state, start)
+    detour = static_map(map_info(obstacles=((0, 0, 0),)))
+    assert len(path) == detour.paths.distance(detour.grid.get(*START), detour.grid.get(*GOAL))
+    assert len(path) > terrain.paths.distance(start, goal)
+    assert_walkable(start, path, state)
+
+    state.place(blocker, terrain.grid.get(-3, 0, 3))
+    path = planner.plan(state, start)
+    assert len(path) == terrain.paths.distance(start, goal)
+    assert_walkable(start, path, state)
+
+
+def test_route_follows_the_moving_tank():
+    terrain = static_map()
+    state = make_state(terrain)
+    start, goal = terrain.grid.get(*START), terrain.grid.get(*GOAL)
+    planner = RoutePlanner(terrain, goal)
+    tank = state.tanks[1]
+
+    path = planner.plan(state, start)
+    state.place(tank, path[1])
+    rest = planner.plan(state, path[1])
+
+    assert len(rest) == len(path) - 2
+    assert rest[-1] is goal
+    assert_walkable(path[1], rest, state)
+
+
+def test_goal_cut_off_by_tanks_gives_no_route():
+    terrain = static_map()
+    ring = [(h.q, h.r, h.s) for h in Hex.hex_ring(Hex(1, -1, 0), 1)]
+    state = make_state(terrain, blockers=ring)
+    start, goal = terrain.grid.get(*START), terrain.grid.get(1, -1, 0)
+
+    assert RoutePlanner(terrain, goal).plan(state, start) == []
+
+
+def test_goal_behind_obstacles_gives_no_route():
+    ring = tuple((h.q, h.r, h.s) for h in Hex.hex_ring(Hex(*GOAL), 1))
+    terrain = static_map(map_info(obstacles=ring))
+    state = make_state(terrain)
+
+    assert RoutePlanner(terrain, terrain.grid.get(*GOAL)).plan(state, terrain.grid.get(*START)) == []
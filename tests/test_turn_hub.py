@@ -0,0 +1,72 @@
+from threading import Event, Thread
+
+from conftest import game_state
+from src.client.turn_hub import TurnHub
+from src.constants import Action
+
+
+# Stands in for the info connection, every state it returns is a new one
+class ClientStub:
+    def __init__(self) -> None:
+        self.turn_number: int = 1
+        self.turn_started: Event = Event()
+        self.turn_release: Event = Event()
+        self.turn_release.set()
+
+    def map(self):
+        return None
+
+    def game_state(self, grid=None):
+        return game_state((), current_turn=self.turn_number)
+
+    def game_actions(self, grid=None):
+        return ()
+
+    def turn(self) -> int:
+        self.turn_started.set()
+        self.turn_release.wait()
+        self.turn_number += 1
+        return 0
+
+
+def test_state_is_fetched_once_per_turn():
+    client = ClientStub()
+    hub = TurnHub(client)
+
+    # The last lobby poll also serves the first turn
+    hub.refresh()
+    for turn in range(1, 10):
+        # The game and two remote players read the state of every turn
+        assert all(hub.state().current_turn == turn for _ in range(3))
+        assert hub.actions() == ()
+        hub.turn()
+
+    assert hub.requests[Action.GAME_STATE] == 9
+    assert hub.requests[Action.GAME_ACTIONS] == 9
+    assert hub.requests[Action.TURN] == 9
+    assert hub.summary().startswith("27 requests over 9 turns (3.00 per turn)")
+
+
+def test_lobby_polls_always_fetch():
+    hub = TurnHub(ClientStub())
+
+    hub.refresh()
+    hub.refresh()
+
+    assert hub.requests[Action.GAME_STATE] == 2
+
+
+def test_view_is_readable_while_a_turn_blocks():
+    client = ClientStub()
+    hub = TurnHub(client)
+    state = hub.state()
+    client.turn_release.clear()
+
+    waiting = Thread(target=hub.turn, daemon=True)
+    waiting.start()
+    assert client.turn_started.wait(5)
+
+    assert hub.view.state is state
+    client.turn_release.set()
+    waiting.join(5)
+    assert hub.state().current_turn == 2
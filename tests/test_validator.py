@@ -0,0 +1,112 @@
+import pytest
+
+from conftest import game_state, map_info, players, vehicle
+from src.map.game_map import Map
+from src.rules import ActionValidator, DesyncError, Rules
+
+VEHICLES = [vehicle(1, 1, "medium_tank", (-3, 3, 0)),
+            vehicle(2, 1, "at_spg", (-3, 1, 2)),
+            vehicle(3, 2, "heavy_tank", (-1, 3, -2)),
+            vehicle(4, 2, "light_tank", (0, 1, -1))]
+
+
+@pytest.fixture
+def game_map(display):
+    game_map = Map(map_info(obstacles=((-2, 2, 0),)), game_state(VEHICLES), players())
+    yield game_map
+    game_map.close()
+
+
+def validator(game_map, strict=False):
+    return ActionValidator(game_map, Rules(game_map), strict=strict)
+
+
+# The server state after a turn in which tank 3 moved to the given hex
+def moved(turn, position):
+    vehicles = [vehicle(3, 2, "heavy_tank", position, spawn=(-1, 3, -2)) if v.id == 3 else v for v in VEHICLES]
+    return game_state(vehicles, current_turn=turn)
+
+
+def test_legal_actions_are_accepted_once_per_turn(game_map):
+    checks = validator(game_map)
+    tank, enemy = game_map.tanks[1], game_map.tanks[3]
+
+    assert checks.check_shot(tank, enemy.position, [enemy])
+    assert not checks.check_move(tank, game_map.grid.get(-2, 3, -1))
+    assert checks.rejections == {"acted": 1}
+
+    checks.start_turn()
+    assert checks.check_move(tank, game_map.grid.get(-2, 3, -1))
+
+
+def test_illegal_moves_are_rejected(game_map):
+    checks = validator(game_map)
+    tank = game_map.tanks[1]
+
+    assert not checks.check_move(tank, tank.position)
+    # Behind the obstacle, three steps away
+    assert not checks.check_move(tank, game_map.grid.get(-1, 1, 0))
+    # Taken by another tank
+    assert not checks.check_move(tank, game_map.tanks[3].position)
+    assert checks.rejections == {"standing": 1, "unreachable": 2}
+
+
+def test_illegal_shots_are_rejected(game_map):
+    checks = validator(game_map)
+    tank, at_spg = game_map.tanks[1], game_map.tanks[2]
+    enemy, far = game_map.tanks[3], game_map.tanks[4]
+
+    assert not checks.check_shot(tank, enemy.position, [])
+    assert not checks.check_shot(tank, far.position, [far])
+    assert not checks.check_shot(tank, enemy.position, [far])
+    assert not checks.check_shot(tank, at_spg.position, [at_spg])
+    assert not checks.check_shot(at_spg, game_map.grid.get(-2, 3, -1), [far])
+    assert checks.rejections == {"no target": 1, "out of range": 1, "target": 1, "own tank": 1, "direction": 1}
+
+
+def test_neutral_tanks_are_not_shot(game_map):
+    checks = validator(game_map)
+    tank, enemy = game_map.tanks[1], game_map.tanks[3]
+    # Player 3 attacked player 2, which never attacked player 1
+    game_map.shoot_actions[3].append(2)
+
+    assert not checks.check_shot(tank, enemy.position, [enemy])
+    assert checks.rejections == {"neutral": 1}
+
+
+def test_turns_out_of_sync_are_counted_once(game_map):
+    checks = validator(game_map)
+
+    game_map.update_map(moved(1, (0, 3, -3)))
+    game_map.update_map(moved(1, (1, 2, -3)))
+    game_map.update_map(moved(2, (1, 2, -3)))
+    game_map.update_map(moved(3, (2, 1, -3)))
+
+    assert not checks.check_sync()
+    assert checks.desyncs == 2
+    # Taken mismatches are not counted again
+    assert checks.check_sync()
+    assert checks.desyncs == 2
+
+
+def test_every_validator_sees_every_mismatch(game_map):
+    first, second = validator(game_map), validator(game_map)
+
+    game_map.update_map(moved(1, (0, 3, -3)))
+    assert not first.check_sync()
+    game_map.update_map(moved(2, (1, 2, -3)))
+
+    assert not second.check_sync()
+    assert (first.desyncs, second.desyncs) == (1, 2)
+
+
+def test_strict_validator_raises_on_desync_in_another_players_turn(game_map):
+    checks = validator(game_map, strict=True)
+    assert checks.check_sync()
+
+    game_map.update_map(moved(4, (0, 3, -3)))
+    game_map.update_map(moved(5, (0, 3, -3)))
+
+    with pytest.raises(DesyncError, match=r"tanks \[3\] in turns \[4\]"):
+        checks.check_sync()
+    assert checks.desyncs == 1